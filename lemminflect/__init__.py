@@ -1,5 +1,4 @@
 import sys
-import logging
 from   .core.Inflections import Inflections
 from   .core.Lemmatizer  import Lemmatizer
 
@@ -17,6 +16,9 @@ def getAllLemmasOOV(word, upos):
 def getLemma(word, upos, lemmatize_oov=True):
     return Lemmatizer().getLemma(word, upos, lemmatize_oov)
 
+def getLemmas(words, upos_list, lemmatize_oov=True):
+    return Lemmatizer().getLemmaBatch(words, upos_list, lemmatize_oov)
+
 def isTagBaseForm(tag):
     return Lemmatizer.isTagBaseForm(tag)
 
@@ -31,22 +33,91 @@ def getAllInflectionsOOV(lemma, upos):
 def getInflection(lemma, tag, inflect_oov=True):
     return Inflections().getInflection(lemma, tag, inflect_oov)
 
+def getInflections(lemmas, tags, inflect_oov=True):
+    return Inflections().getInflectionBatch(lemmas, tags, inflect_oov)
+
+# Column versions of getLemma and getInflection for numpy arrays (or any sequence).  Return an
+# array of the first lemma / inflection for each row and a bool array that's True for the
+# rows that weren't in the dictionary (OOV).  tags can be a single tag for all the rows.
+def getLemmaArray(words, upos, lemmatize_oov=True, on_empty_ret_word=True):
+    from .core.Columnar import getLemmaArray
+    return getLemmaArray(words, upos, lemmatize_oov, on_empty_ret_word)
+
+def getInflectionArray(lemmas, tags, inflect_oov=True, on_empty_ret_word=True):
+    from .core.Columnar import getInflectionArray
+    return getInflectionArray(lemmas, tags, inflect_oov, on_empty_ret_word)
+
 # Set which lemmatizer to use
 def setUseInternalLemmatizer(TF):
     Inflections().setUseInternalLemmatizer(TF)
 
-# Hook into spacy
-try:
-    import spacy
-except ImportError:
-    pass
+# Return read-only views of the stored data from getAllLemmas and getAllInflections
+# instead of building new dictionaries on every call
+def setReadOnlyResults(TF):
+    Lemmatizer().setReadOnlyResults(TF)
+    Inflections().setReadOnlyResults(TF)
+
+# Set the maximum size of the getLemma and getInflection result caches.  0 disables them.
+def setCacheSize(maxsize):
+    Lemmatizer().setCacheSize(maxsize)
+    Inflections().setCacheSize(maxsize)
+
+def clearCaches():
+    Lemmatizer().clearCache()
+    Inflections().clearCache()
+
+# Return the cache statistics (hits, misses, maxsize, currsize) for each cache
+# The OOV model caches are None until the models are loaded.
+def cacheInfo():
+    return {'lemma':Lemmatizer().cacheInfo(), 'inflection':Inflections().cacheInfo(),
+            'lemma_oov':Lemmatizer().oovCacheInfo(), 'inflection_oov':Inflections().oovCacheInfo()}
+
+# Enable or disable the usage counters (dictionary hits, OOV model runs, etc..).  They're
+# disabled by default (see config.collect_stats).
+def setCollectStats(TF):
+    Lemmatizer().setCollectStats(TF)
+    Inflections().setCollectStats(TF)
+
+# Return a snapshot of the usage counters, the time to load each resource and the memory saved
+# by interning (config.lu_intern) for the lemmatizer and inflections
+def stats():
+    return {'lemma':Lemmatizer().stats(), 'inflection':Inflections().stats()}
+
+# Load the data for the components ('lemma', 'lemma_oov', 'inflection', 'inflection_oov' or
+# None for all) ahead of the first call.  With background=True this is done in a separate thread.
+def preload(components=None, background=False):
+    from .core.Preload import preload
+    preload(components, background)
+
+# Block until background preloading is finished. Returns False if it's not done after timeout seconds.
+def waitUntilLoaded(timeout=None):
+    from .core.Preload import waitUntilLoaded
+    return waitUntilLoaded(timeout)
+
+# Publish the lookup tables and model weights to shared memory for use by worker processes.
+# Returns a spec dict to pass to attachSharedData in each worker (ie.. as the Pool initializer).
+def publishSharedData():
+    from .core.SharedData import publishSharedData
+    return publishSharedData()
+
+def attachSharedData(spec):
+    from .core.SharedData import attachSharedData
+    attachSharedData(spec)
+
+# Call once the workers are finished to release the shared memory
+def unlinkSharedData():
+    from .core.SharedData import unlinkSharedData
+    unlinkSharedData()
+
+# Compile the lookup tables into the binary files used with config.lu_format = 'mmap'.  Pass a
+# writable out_dir, and set config.lu_bin_dir to it, if the package directory isn't writable.
+# Returns the list of files written.
+def buildBinLookups(out_dir=None):
+    from .codecs.LexiconBinCodec import LexiconBinCodec
+    return LexiconBinCodec.build(out_dir)
+
+# Hook into spacy, but only if it's already been imported so that importing lemminflect doesn't
+# import spacy.  Otherwise use `import lemminflect.spacy` or lemminflect.spacy.register().
 if 'spacy' in sys.modules:
-    min_version = '2.0'
-    mv = min_version.split('.')
-    sv = spacy.__version__.split('.')
-    if sv[0] > mv[0] or (sv[0] == mv[0] and sv[1] >= mv[1]):
-        spacy.tokens.Token.set_extension('lemma',   method=Lemmatizer().spacyGetLemma)
-        spacy.tokens.Token.set_extension('inflect', method=Inflections().spacyGetInfl)
-    else:
-        logging.warning('Spacy extensions are disabled.  Spacy version is %s.  '
-                        'A minimum of %s is required', spacy.__version__, min_version)
+    from . import spacy as _spacy
+    _spacy.register()
@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import weakref
+from   concurrent.futures import ThreadPoolExecutor
+from   .core.Lemmatizer  import Lemmatizer
+from   .core.Inflections import Inflections
+from   .core.Preload import preload as _preload
+from   . import config
+
+# asyncio interface
+# Coroutine versions of getLemma, getInflection and their batch versions.  Calls made within
+# a short window of each other (config.aio_batch_window seconds) are collected and run together
+# as a single getLemmaBatch / getInflectionBatch call, so the dictionary lookups and the OOV model
+# are run once for all of them.  The batches are run on a worker thread, so the event loop is
+# never blocked by the model or by the first-time loading of the data.
+#   lemmas = await lemminflect.aio.getLemma('watches', 'VERB')
+# Use AsyncLemmInflect directly for different window or batch size settings.
+
+
+# Collects the items submitted from coroutines on one event loop and runs them in batches with
+# batch_func(items) -> results, on the executor.  A batch is run when the window expires after
+# the first item arrives, or as soon as max_batch_size items are waiting.
+class MicroBatcher(object):
+    def __init__(self, loop, batch_func, executor, batch_window, max_batch_size):
+        self.loop           = loop
+        self.batch_func     = batch_func
+        self.executor       = executor
+        self.batch_window   = batch_window
+        self.max_batch_size = max(1, max_batch_size)
+        self.pending        = []    # (items, future) for each submission
+        self.num_pending    = 0     # number of items in pending
+        self.timer          = None
+        self.num_batches    = 0
+
+    # Submit a list of items and return the list of their results.  Lists larger than
+    # max_batch_size are split across batches.
+    async def submit(self, items):
+        if not items:
+            return []
+        futures = []
+        for i in range(0, len(items), self.max_batch_size):
+            chunk  = items[i:i+self.max_batch_size]
+            future = self.loop.create_future()
+            if self.num_pending + len(chunk) > self.max_batch_size:
+                self._flush()
+            self.pending.append((chunk, future))
+            self.num_pending += len(chunk)
+            futures.append(future)
+            if self.num_pending >= self.max_batch_size:
+                self._flush()
+            elif self.timer is None:
+                self.timer = self.loop.call_later(self.batch_window, self._flush)
+        if len(futures) == 1:
+            return await futures[0]
+        results = []
+        for chunk_results in await asyncio.gather(*futures):
+            results += chunk_results
+        return results
+
+    # Run everything that's pending as one batch
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending, self.num_pending = self.pending, [], 0
+        if not pending:
+            return
+        items = [item for chunk, _ in pending for item in chunk]
+        self.num_batches += 1
+        task = self.loop.run_in_executor(self.executor, self.batch_func, items)
+        task.add_done_callback(lambda task: self._setResults(pending, task))
+
+    # Give each submission its part of the batch results.  If the batch failed and has more than
+    # one submission, they're re-run separately so an error only goes to the submission that
+    # caused it, not to every caller in the window.
+    def _setResults(self, pending, task):
+        if task.cancelled():
+            for _, future in pending:
+                future.cancel()
+            return
+        error = task.exception()
+        if error is not None and len(pending) > 1:
+            for chunk, future in pending:
+                if not future.done():
+                    task = self.loop.run_in_executor(self.executor, self.batch_func, chunk)
+                    task.add_done_callback(lambda task, sub=(chunk, future): \
+                                           self._setResults([sub], task))
+            return
+        if error is None:
+            results = task.result()
+        start = 0
+        for chunk, future in pending:
+            if not future.done():  # ie.. the caller was cancelled
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[start:start+len(chunk)])
+            start += len(chunk)
+
+
+# Run getLemmaBatch / getInflectionBatch for items of (word, tag, oov_flag).  The items are split
+# by the flag since it applies to the whole batch call.
+def _runLemmaBatch(items):
+    return _runGrouped(items, Lemmatizer().getLemmaBatch)
+
+def _runInflectionBatch(items):
+    return _runGrouped(items, Inflections().getInflectionBatch)
+
+# Return the list of (word, tag, oov_flag) items.  Raises TypeError if a word or tag isn't a str.
+def _makeItems(words, tags, oov_flag, word_name, tag_name):
+    items = []
+    for word, tag in zip(words, tags):
+        if not isinstance(word, str):
+            raise TypeError('%s must be a str, not %s' % (word_name, type(word).__name__))
+        if not isinstance(tag, str):
+            raise TypeError('%s must be a str, not %s' % (tag_name, type(tag).__name__))
+        items.append((word, tag, oov_flag))
+    return items
+
+def _runGrouped(items, batch_func):
+    results = [None]*len(items)
+    for flag in (True, False):
+        idxs = [i for i, item in enumerate(items) if bool(item[2]) is flag]
+        if idxs:
+            values = batch_func([items[i][0] for i in idxs], [items[i][1] for i in idxs], flag)
+            for i, value in zip(idxs, values):
+                results[i] = value
+    return results
+
+
+# The async API, with its own batch settings.  The Lemmatizer and Inflections singletons are
+# shared with the rest of the library.  The batchers are created for each event loop they're
+# used from.  If executor is None, a single worker thread is started on first use.
+class AsyncLemmInflect(object):
+    def __init__(self, batch_window=None, max_batch_size=None, executor=None):
+        self.batch_window   = config.aio_batch_window   if batch_window   is None else batch_window
+        self.max_batch_size = config.aio_max_batch_size if max_batch_size is None else max_batch_size
+        self.executor       = executor
+        self.batchers       = weakref.WeakKeyDictionary()   # loop -> {name:MicroBatcher}
+        self.lock           = threading.Lock()
+
+    # The words and tags are checked before they're submitted, so a bad item raises TypeError
+    # in its caller instead of failing the batch it would be run in.
+    async def getLemma(self, word, upos, lemmatize_oov=True):
+        items = _makeItems([word], [upos], lemmatize_oov, 'word', 'upos')
+        return (await self._getBatcher('lemma').submit(items))[0]
+
+    async def getLemmas(self, words, upos_list, lemmatize_oov=True):
+        if len(words) != len(upos_list):
+            raise ValueError('Length of words (%d) and upos_list (%d) differ' % \
+                (len(words), len(upos_list)))
+        items = _makeItems(words, upos_list, lemmatize_oov, 'word', 'upos')
+        return await self._getBatcher('lemma').submit(items)
+
+    async def getInflection(self, lemma, tag, inflect_oov=True):
+        items = _makeItems([lemma], [tag], inflect_oov, 'lemma', 'tag')
+        return (await self._getBatcher('inflection').submit(items))[0]
+
+    async def getInflections(self, lemmas, tags, inflect_oov=True):
+        if len(lemmas) != len(tags):
+            raise ValueError('Length of lemmas (%d) and tags (%d) differ' % \
+                (len(lemmas), len(tags)))
+        items = _makeItems(lemmas, tags, inflect_oov, 'lemma', 'tag')
+        return await self._getBatcher('inflection').submit(items)
+
+    # Load the data on the worker thread (see lemminflect.preload)
+    async def preload(self, components=None):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._getExecutor(), _preload, components)
+
+    # Number of batches run on the event loop (default is the current one), by name ('lemma' or
+    # 'inflection')
+    def numBatches(self, loop=None):
+        batchers = self.batchers.get(loop or asyncio.get_running_loop(), {})
+        return {name:batcher.num_batches for name, batcher in batchers.items()}
+
+    def _getExecutor(self):
+        if self.executor is None:
+            with self.lock:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=1,
+                                                       thread_name_prefix='lemminflect-aio')
+        return self.executor
+
+    def _getBatcher(self, name):
+        loop = asyncio.get_running_loop()
+        batchers = self.batchers.get(loop)
+        if batchers is None:
+            batchers = self.batchers[loop] = {}
+        batcher = batchers.get(name)
+        if batcher is None:
+            batch_func = _runLemmaBatch if name == 'lemma' else _runInflectionBatch
+            batcher = batchers[name] = MicroBatcher(loop, batch_func, self._getExecutor(),
+                                                    self.batch_window, self.max_batch_size)
+        return batcher
+
+
+# Module level API using the config settings
+_default = AsyncLemmInflect()
+
+async def getLemma(word, upos, lemmatize_oov=True):
+    return await _default.getLemma(word, upos, lemmatize_oov)
+
+async def getLemmas(words, upos_list, lemmatize_oov=True):
+    return await _default.getLemmas(words, upos_list, lemmatize_oov)
+
+async def getInflection(lemma, tag, inflect_oov=True):
+    return await _default.getInflection(lemma, tag, inflect_oov)
+
+async def getInflections(lemmas, tags, inflect_oov=True):
+    return await _default.getInflections(lemmas, tags, inflect_oov)
+
+async def preload(components=None):
+    await _default.preload(components)
+
+# Change the batch settings used by the module level functions.  This applies to batchers created
+# afterwards, so call it before the first request.
+def configure(batch_window=None, max_batch_size=None):
+    global _default
+    _default = AsyncLemmInflect(batch_window, max_batch_size, _default.executor)
@@ -0,0 +1,167 @@
+import io
+import os
+import sys
+import csv
+import logging
+import argparse
+import multiprocessing
+from   itertools import islice
+from   collections import deque
+from   .core.Lemmatizer  import Lemmatizer
+from   .core.Inflections import Inflections
+from   .core.LexicalUtils import tagToUPos
+
+# Command line interface (the lemminflect console script)
+#   lemminflect lemma   [files..]     input lines are  word<TAB>tag   (Penn or UPOS tag)
+#   lemminflect inflect [files..]     input lines are  lemma<TAB>tag  (Penn tag to inflect to)
+# Reads stdin if no files are given (or for '-').  The result is added as a new column, or
+# written on its own with --result-only.  Words without a result (ie.. punctuation) are
+# written unchanged.  The input is processed in chunks of --chunk-size lines with the batch
+# methods, so memory use doesn't depend on the size of the input.  With --workers N the chunks
+# are processed by N processes, using shared memory for the data, and written in input order.
+DEFAULT_CHUNK_SIZE = 10000
+
+
+# Lemmatize or inflect a chunk of lines and return the output text
+def processChunk(lines, mode, delimiter=None, result_only=False, use_oov=True):
+    rows = [splitLine(line, delimiter) for line in lines]
+    if mode == 'lemma':
+        results = lemmatizeRows(rows, use_oov)
+    else:
+        results = inflectRows(rows, use_oov)
+    out = io.StringIO()
+    for row, result in zip(rows, results):
+        if result_only:
+            out.write(result + '\n')
+        elif delimiter is None:
+            out.write('\t'.join(row + [result]) + '\n')
+        else:
+            csv.writer(out, delimiter=delimiter, lineterminator='\n').writerow(row + [result])
+    return out.getvalue()
+
+# Split a line into columns.  delimiter=None is tab separated without quoting.
+def splitLine(line, delimiter=None):
+    line = line.rstrip('\r\n')
+    if delimiter is None:
+        return line.split('\t')
+    return next(csv.reader([line], delimiter=delimiter), [])
+
+# Return the first lemma for each word, using the upos tag or the upos for the Penn tag.  Words
+# that are already in their base form (by Penn tag), or that can't be lemmatized, are returned.
+def lemmatizeRows(rows, use_oov=True):
+    results = [row[0] if row else '' for row in rows]
+    idxs, words, upos_list = [], [], []
+    for i, row in enumerate(rows):
+        if len(row) < 2:
+            continue
+        tag = row[1].strip()
+        upos = tag.upper()
+        if upos not in Lemmatizer.DICT_UPOS_TYPES:
+            if Lemmatizer.isTagBaseForm(tag):
+                continue
+            upos = tagToUPos(tag)
+            if upos not in Lemmatizer.DICT_UPOS_TYPES:
+                continue
+        idxs.append(i)
+        words.append(row[0])
+        upos_list.append(upos)
+    for i, lemmas in zip(idxs, Lemmatizer().getLemmaBatch(words, upos_list, use_oov)):
+        if lemmas:
+            results[i] = lemmas[0]
+    return results
+
+# Return the first inflection of each lemma for the Penn tag
+def inflectRows(rows, use_oov=True):
+    results = [row[0] if row else '' for row in rows]
+    idxs, lemmas, tags = [], [], []
+    for i, row in enumerate(rows):
+        if len(row) < 2:
+            continue
+        tag = row[1].strip().upper()
+        if tagToUPos(tag) not in Inflections.DICT_UPOS_TYPES:
+            continue
+        idxs.append(i)
+        lemmas.append(row[0])
+        tags.append(tag)
+    for i, forms in zip(idxs, Inflections().getInflectionBatch(lemmas, tags, use_oov)):
+        if forms:
+            results[i] = forms[0]
+    return results
+
+
+# Generate the lines of the files in order.  '-' is stdin.
+def readLines(fns):
+    for fn in (fns or ['-']):
+        if fn == '-':
+            yield from sys.stdin
+        else:
+            with open(fn, 'r', encoding='utf8') as f:
+                yield from f
+
+# Generate lists of up to chunk_size lines
+def readChunks(lines, chunk_size):
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+# Process the chunks and write the output in order.  With more than 1 worker, at most
+# 2 chunks per worker are queued at a time, to keep the memory use constant.
+def run(chunks, out, workers=1, **kwargs):
+    if workers <= 1:
+        for chunk in chunks:
+            out.write(processChunk(chunk, **kwargs))
+        return
+    from .core.SharedData import publishSharedData, attachSharedData, unlinkSharedData
+    spec = publishSharedData()
+    try:
+        with multiprocessing.Pool(workers, initializer=attachSharedData, initargs=(spec,)) as pool:
+            queued = deque()
+            for chunk in chunks:
+                if len(queued) >= 2*workers:
+                    out.write(queued.popleft().get())
+                queued.append(pool.apply_async(processChunk, (chunk,), kwargs))
+            while queued:
+                out.write(queued.popleft().get())
+    finally:
+        unlinkSharedData()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='lemminflect',
+                                     description='Lemmatize or inflect tagged words')
+    parser.add_argument('mode', choices=['lemma', 'inflect'],
+                        help='lemma: lines are word,tag (Penn or UPOS).  '
+                             'inflect: lines are lemma,Penn tag to inflect to')
+    parser.add_argument('files', nargs='*', help="Input files (default or '-' is stdin)")
+    parser.add_argument('--csv', action='store_true', help='Input and output are csv, not tsv')
+    parser.add_argument('--result-only', action='store_true',
+                        help='Only write the result, not the input columns')
+    parser.add_argument('--no-oov', action='store_true',
+                        help="Don't use the OOV models for words not in the dictionary")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='Number of lines processed together')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+
+    logging.basicConfig(level=logging.WARNING, format='[%(levelname)s %(name)s] %(message)s')
+    chunks = readChunks(readLines(args.files), args.chunk_size)
+    try:
+        run(chunks, sys.stdout, args.workers, mode=args.mode,
+            delimiter=',' if args.csv else None, result_only=args.result_only,
+            use_oov=not args.no_oov)
+    except BrokenPipeError:     # ie.. piped to head
+        # Point stdout at devnull so the flush at exit doesn't raise again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except FileNotFoundError as e:
+        parser.exit(1, 'lemminflect: %s\n' % e)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -67,13 +67,19 @@ class InflectionLUCodec(object):
         return word, category, forms_dict
 
     # Load inflections_lu.csv
+    # If interner (utils.Interning.LookupInterner) is supplied, the duplicate strings and tuples
+    # are shared.  The entries aren't since each one holds the word's own base form.
     @classmethod
-    def load(cls, fn):
+    def load(cls, fn, interner=None):
         infl_dict = {}
         with gzip.open(fn, 'rb') as f:
             for line in f:
                 line = line.decode()
                 word, _, forms_dict = cls.fromString(line)
+                if interner is not None:
+                    word = interner.internString(word)
+                    for tag, spellings in forms_dict.items():
+                        forms_dict[tag] = interner.internSpellings(spellings)
                 if word not in infl_dict:
                     infl_dict[word] = forms_dict
                 else:
@@ -19,18 +19,43 @@ class LemmaLUCodec(object):
         line = '%s,%s,%s\n' % (word, category, forms_str)
         return line
 
+    # Iterate over the (word, upos, lemma_spellings) for each line of the file
+    @classmethod
+    def iterate(cls, fn):
+        with gzip.open(fn, 'rb') as f:
+            for line in f:
+                word, category, forms = cls.fromString(line.decode())
+                yield word, categoryToUPos(category), forms
+
     # Data format is word,category,lemma_spellings (separated by /)
     # Convert from the native "category" to upos on load
+    # If interner (utils.Interning.LookupInterner) is supplied, the duplicate strings, tuples and
+    # entries are shared.
     @classmethod
-    def load(cls, fn):
+    def load(cls, fn, interner=None):
+        if interner is not None:
+            return cls._loadInterned(fn, interner)
         lemma_dict = {}
-        with gzip.open(fn, 'rb') as f:
-            for line in f:
-                line = line.decode()
-                word, category, forms = cls.fromString(line)
-                upos = categoryToUPos(category)
-                if word not in lemma_dict:
-                    lemma_dict[word] = {upos:forms}
-                else:
-                    lemma_dict[word].update( {upos:forms} )
+        for word, upos, forms in cls.iterate(fn):
+            if word not in lemma_dict:
+                lemma_dict[word] = {upos:forms}
+            else:
+                lemma_dict[word].update( {upos:forms} )
+        return lemma_dict
+
+    # The lines for each word are normally together so each word's entry is completed before
+    # it's interned.  Shared entries are copied if the word is seen again.
+    @classmethod
+    def _loadInterned(cls, fn, interner):
+        lemma_dict = {}
+        word, entry = None, None
+        for line_word, upos, forms in cls.iterate(fn):
+            if line_word != word:
+                if word is not None:
+                    lemma_dict[word] = interner.internEntry(entry)
+                word  = interner.internString(line_word)
+                entry = dict(lemma_dict.get(word, {}))
+            entry[interner.internString(upos)] = interner.internSpellings(forms)
+        if word is not None:
+            lemma_dict[word] = interner.internEntry(entry)
         return lemma_dict
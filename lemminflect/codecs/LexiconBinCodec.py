@@ -0,0 +1,261 @@
+import os
+import mmap
+import logging
+from   array import array
+from   collections.abc import Mapping
+from   ..utils.PerfectHash import buildPerfectHash, perfectHashSlot
+from   .. import config
+
+
+# Reader/writer for the compiled binary version of the lookup tables (lemma_lu and infl_lu).
+# Both tables are dicts of word -> {tag:(spellings,..)}, so the same format works for both.
+# The file is designed to be memory-mapped and read directly, without parsing.
+#
+# File layout (all integers are native uint32)
+#   header      : MAGIC, BOM, VERSION, n_strings, n_keys, n_data, and the byte position of
+#                 each of the sections below
+#   str_offs    : n_strings+1 byte offsets into the string pool
+#   keys        : n_keys string ids, in the order of the index (see below)
+#   entry_offs  : n_keys+1 offsets into data for each key
+#   data        : for each key, a sequence of (tag_id, n_spellings, spelling_id, ...)
+#   disp        : (version 2 only) n_keys int32 displacements for the perfect hash
+#   pool        : utf-8 bytes of all unique strings
+# In version 1 the keys are sorted by their utf-8 bytes and found with a binary search.  In
+# version 2 they're in the slot order of a minimal perfect hash (see utils/PerfectHash.py) so a
+# lookup is a hash, a read of the displacement and a compare with the key in the slot.
+class LexiconBinCodec(object):
+    MAGIC    = 0x554c494c    # 'LILU'
+    BOM      = 0x01020304    # used to detect files written with a different byte order
+    VERSION  = 2
+    HDR_SIZES = {1:11, 2:12} # number of uint32 in the header for each version
+
+    # Convert the lookup dict to the binary format.  index is 'hash' for the perfect hash
+    # (version 2) or 'sorted' for the binary search (version 1).
+    @classmethod
+    def toBytes(cls, lu_dict, index='hash'):
+        # Build the string pool, with each unique string stored once
+        str_ids = {}
+        pool    = bytearray()
+        str_offs = array('I', [0])
+        def getID(string):
+            sid = str_ids.get(string)
+            if sid is None:
+                sid = str_ids[string] = len(str_offs) - 1
+                pool.extend(string.encode('utf-8'))
+                str_offs.append(len(pool))
+            return sid
+        words = sorted(lu_dict.keys(), key=lambda w:w.encode('utf-8'))
+        if index == 'hash':
+            version = 2
+            disp, slots = buildPerfectHash([w.encode('utf-8') for w in words])
+            words = [words[i] for i in slots]
+            sections_extra = [disp]
+        elif index == 'sorted':
+            version = 1
+            sections_extra = []
+        else:
+            raise ValueError('Unhandled index type = %s' % index)
+        keys       = array('I')
+        entry_offs = array('I', [0])
+        data       = array('I')
+        for word in words:
+            keys.append(getID(word))
+            for tag, spellings in lu_dict[word].items():
+                data.append(getID(tag))
+                data.append(len(spellings))
+                data.extend(getID(s) for s in spellings)
+            entry_offs.append(len(data))
+        # Compute the section positions and write it out
+        sections = [str_offs, keys, entry_offs, data] + sections_extra
+        positions = []
+        pos = 4 * cls.HDR_SIZES[version]
+        for section in sections:
+            positions.append(pos)
+            pos += 4 * len(section)
+        positions.append(pos)   # pool
+        header = array('I', [cls.MAGIC, cls.BOM, version, len(str_offs)-1, len(keys),
+                             len(data)] + positions)
+        assert len(header) == cls.HDR_SIZES[version]
+        out = bytearray(header.tobytes())
+        for section in sections:
+            out.extend(section.tobytes())
+        out.extend(pool)
+        return bytes(out)
+
+    # Save the lookup dict in the binary format
+    @classmethod
+    def save(cls, lu_dict, fn):
+        with open(fn, 'wb') as f:
+            f.write(cls.toBytes(lu_dict))
+
+    # Memory-map the file and return a read-only Mapping of the data
+    @staticmethod
+    def load(fn):
+        with open(fn, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return MappedLexicon(mm)
+
+    # Name of the binary file that corresponds to the csv.gz lookup file.  This is next to the
+    # csv file, or in config.lu_bin_dir if it's set.
+    @staticmethod
+    def getBinFilename(csv_fn):
+        bin_fn = csv_fn + '.bin'
+        for ext in ('.csv.gz', '.csv'):
+            if csv_fn.endswith(ext):
+                bin_fn = csv_fn[:-len(ext)] + '.bin'
+                break
+        if config.lu_bin_dir is not None:
+            bin_fn = os.path.join(config.lu_bin_dir, os.path.basename(bin_fn))
+        return bin_fn
+
+    # Compile the lemma and inflection csv lookup files into the binary format and return the
+    # list of filenames written.  The files are written to out_dir, or where getBinFilename
+    # puts them if it's None.  To use files in another directory, set config.lu_bin_dir to it
+    # and config.lu_format = 'mmap'.
+    @classmethod
+    def build(cls, out_dir=None):
+        from .LemmaLUCodec      import LemmaLUCodec
+        from .InflectionLUCodec import InflectionLUCodec
+        bin_fns = []
+        for csv_fn, codec in [(config.lemma_lu_fn, LemmaLUCodec),
+                              (config.inflection_lu_fn, InflectionLUCodec)]:
+            bin_fn = cls.getBinFilename(csv_fn)
+            if out_dir is not None:
+                os.makedirs(out_dir, exist_ok=True)
+                bin_fn = os.path.join(out_dir, os.path.basename(bin_fn))
+            cls.save(codec.load(csv_fn), bin_fn)
+            bin_fns.append(bin_fn)
+        return bin_fns
+
+    # Load the binary file associated with the csv lookup, or return None if it hasn't
+    # been built (see build above)
+    @classmethod
+    def loadForCSV(cls, csv_fn):
+        bin_fn = cls.getBinFilename(csv_fn)
+        if not os.path.exists(bin_fn):
+            logging.getLogger(__name__).warning('Binary lookup %s not found.  Using %s', \
+                bin_fn, csv_fn)
+            return None
+        return cls.load(bin_fn)
+
+
+# Read-only dict style access to the binary lookup data.
+# Values are decoded from the buffer on each access.  The buffer can be anything that
+# supports the buffer protocol (mmap, bytes, shared memory, etc..)
+# Entries assigned with [] (ie.. overrides) are held in memory, on top of the buffer data.
+class MappedLexicon(Mapping):
+    def __init__(self, buf):
+        self.buf = buf
+        mv = memoryview(buf)
+        header = mv[:4*3].cast('I')
+        if header[0] != LexiconBinCodec.MAGIC:
+            raise ValueError('Invalid binary lookup data')
+        if header[1] != LexiconBinCodec.BOM:
+            raise ValueError('Binary lookup was written with a different byte order')
+        self.version = header[2]
+        if self.version not in LexiconBinCodec.HDR_SIZES:
+            raise ValueError('Unhandled binary lookup version = %d' % self.version)
+        header = mv[:4*LexiconBinCodec.HDR_SIZES[self.version]].cast('I')
+        n_strings, n_keys, n_data = header[3], header[4], header[5]
+        p_str_offs, p_keys, p_entry_offs, p_data = header[6:10]
+        p_pool = header[-1]
+        self.str_offs   = mv[p_str_offs:p_str_offs+4*(n_strings+1)].cast('I')
+        self.keys       = mv[p_keys:p_keys+4*n_keys].cast('I')
+        self.entry_offs = mv[p_entry_offs:p_entry_offs+4*(n_keys+1)].cast('I')
+        self.data       = mv[p_data:p_data+4*n_data].cast('I')
+        self.pool       = mv[p_pool:]
+        self.overlay    = {}
+        self.tags       = {}    # decoded tag strings by id
+        if self.version >= 2:
+            p_disp = header[10]
+            self.disp = mv[p_disp:p_disp+4*n_keys].cast('i')
+            self._find = self._findHashed
+
+    def __getitem__(self, word):
+        entry = self.overlay.get(word)
+        if entry is not None:
+            return entry
+        idx = self._find(word)
+        if idx is None:
+            raise KeyError(word)
+        return self._decodeEntry(idx)
+
+    # Same as Mapping.get but without raising and catching a KeyError for missing words
+    def get(self, word, default=None):
+        entry = self.overlay.get(word)
+        if entry is not None:
+            return entry
+        idx = self._find(word)
+        if idx is None:
+            return default
+        return self._decodeEntry(idx)
+
+    def __setitem__(self, word, entry):
+        self.overlay[word] = entry
+
+    def __contains__(self, word):
+        return word in self.overlay or self._find(word) is not None
+
+    def __len__(self):
+        return len(self.keys) + sum(1 for w in self.overlay if self._find(w) is None)
+
+    def __iter__(self):
+        for sid in self.keys:
+            word = self._getString(sid)
+            if word not in self.overlay:
+                yield word
+        yield from self.overlay
+
+    # Use the perfect hash to get the index of the word in the keys
+    def _findHashed(self, word):
+        try:
+            target = word.encode('utf-8')
+        except (AttributeError, UnicodeEncodeError):
+            return None
+        if not len(self.keys):
+            return None
+        idx = perfectHashSlot(target, self.disp)
+        sid = self.keys[idx]
+        if self.pool[self.str_offs[sid]:self.str_offs[sid+1]] == target:
+            return idx
+        return None
+
+    # Binary search for the index of the word in the keys (version 1)
+    def _find(self, word):
+        try:
+            target = word.encode('utf-8')
+        except (AttributeError, UnicodeEncodeError):
+            return None
+        keys, str_offs, pool = self.keys, self.str_offs, self.pool
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            sid = keys[mid]
+            key = pool[str_offs[sid]:str_offs[sid+1]].tobytes()
+            if key < target:
+                lo = mid + 1
+            elif key > target:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _getString(self, sid):
+        return str(self.pool[self.str_offs[sid]:self.str_offs[sid+1]], 'utf-8')
+
+    # Decode the {tag:(spellings,..)} dict for the key index.  There are only a few tags so the
+    # decoded strings are kept.
+    def _decodeEntry(self, idx):
+        data, str_offs, pool, tags = self.data, self.str_offs, self.pool, self.tags
+        entry = {}
+        i, end = self.entry_offs[idx], self.entry_offs[idx+1]
+        while i < end:
+            tag = tags.get(data[i])
+            if tag is None:
+                tag = tags[data[i]] = self._getString(data[i])
+            nspell = data[i+1]
+            i += 2
+            entry[tag] = tuple([str(pool[str_offs[sid]:str_offs[sid+1]], 'utf-8') \
+                                for sid in data[i:i+nspell]])
+            i += nspell
+        return entry
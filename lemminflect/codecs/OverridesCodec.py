@@ -20,3 +20,14 @@ class OverridesCodec(object):
                 else:
                     d[word_in].update( entry )
         return d
+
+    # Merge the overrides into a lookup dict (word -> {tag:spellings}) in place.
+    # Any tag in the overrides replaces the value in the lookup.
+    # Entries are re-assigned, rather than updated, so this works with a MappedLexicon too.
+    @staticmethod
+    def apply(lu_dict, overrides_dict):
+        for word_in, entry in overrides_dict.items():
+            merged = dict(lu_dict.get(word_in, {}))
+            merged.update( entry )
+            lu_dict[word_in] = merged
+        return lu_dict
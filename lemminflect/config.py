@@ -26,6 +26,10 @@ ftable_fn            = os.path.join(data_repo, 'forms_table.dat.gz')
 lemma_lu_fn         = os.path.join(proj_resources, 'lemma_lu.csv.gz')
 inflection_lu_fn    = os.path.join(proj_resources, 'infl_lu.csv.gz')
 
+# Compiled, memory-mappable versions of the above (built by 02_BuildLookups/14_BuildBinaryLU.py)
+lemma_lu_bin_fn     = os.path.join(proj_resources, 'lemma_lu.bin')
+inflection_lu_bin_fn = os.path.join(proj_resources, 'infl_lu.bin')
+
 # Temporary files used with the NN models
 model_lemma_cl_fn   = os.path.join(data_repo, 'model_lemma_classes.csv')
 lemma_tcorp_fn      = os.path.join(data_repo, 'lemma_tcorp.csv.gz')
@@ -35,6 +39,10 @@ infl_tcorp_fn       = os.path.join(data_repo, 'infl_tcorp.csv.gz')
 model_lemma_fn      = os.path.join(proj_resources, 'model_lemma.pkl.gz')
 model_infl_fn       = os.path.join(proj_resources, 'model_infl.pkl.gz')
 
+# Suffix tables distilled from the models (built by 03_BuildLITypeModels/30_BuildSuffixTables.py)
+model_lemma_table_fn = os.path.join(proj_resources, 'model_lemma_table.pkl.gz')
+model_infl_table_fn  = os.path.join(proj_resources, 'model_infl_table.pkl.gz')
+
 # Project overrides file locations
 lemma_overrides_fn  = os.path.join(proj_resources, 'lemma_overrides.csv')
 infl_overrides_fn   = os.path.join(proj_resources, 'infl_overrides.csv')
@@ -43,5 +51,37 @@ infl_overrides_fn   = os.path.join(proj_resources, 'infl_overrides.csv')
 acc_word_set_fn     = os.path.join(data_repo, 'acc_word_set.txt')
 acc_lemma_corp_fn   = os.path.join(data_repo, 'acc_lemma_corp.csv')
 
-# default Keras model inference engine
-kinfer_type         = 'numpy'   # numpy or keras
+# default Keras model inference engine.  'table' uses the distilled suffix tables and doesn't
+# require numpy.
+kinfer_type         = 'numpy'   # numpy, keras or table
+# Precision of the numpy engine's weights.  float16 and int8 use less memory with very small
+# differences in the outputs (see 03_BuildLITypeModels/32_QuantizeModels.py)
+kinfer_precision    = 'float32' # float32, float16 or int8
+
+# Maximum number of results held in the getLemma and getInflection caches (0 disables them)
+lemma_cache_size    = 8192
+infl_cache_size     = 8192
+# Maximum number of OOV model results cached.  These are keyed by the part of the word the model
+# sees (the category and the last 8 letters) so many words share each entry.
+oov_cache_size      = 16384
+
+# Format used to load the lookup tables at run-time.  With 'mmap' the compiled .bin files are
+# memory-mapped instead of parsing the csv files.  If they don't exist, the csv files are used.
+# With 'unified' both tables are loaded into a single store (see core/UnifiedLexicon.py), which
+# uses less memory when both lemmatizing and inflecting.
+lu_format           = 'csv'     # csv, mmap or unified
+# Directory with the compiled .bin lookup files for 'mmap'.  None is the resources directory.
+# Use LexiconBinCodec.build(dir) to create them, ie.. when the package directory isn't writable.
+lu_bin_dir          = None
+# Share the duplicate strings, tuples and word entries in the tables loaded from the csv files.
+# This reduces the memory for each process but makes loading slower.
+lu_intern           = False
+
+# lemminflect.aio batching.  Calls made within batch_window seconds of the first one are run
+# together as a single batch, up to max_batch_size words.
+aio_batch_window    = 0.002
+aio_max_batch_size  = 1024
+
+# Count the dictionary hits, OOV model runs, etc.. in the Lemmatizer and Inflections (see
+# lemminflect.stats).  This can also be changed at run-time with lemminflect.setCollectStats.
+collect_stats       = False
@@ -0,0 +1,80 @@
+import logging
+from   itertools import repeat
+from   .Lemmatizer   import Lemmatizer
+from   .Inflections  import Inflections
+from   .LexicalUtils import tagToUPos
+
+# Column (array) versions of getLemma and getInflection for numpy / pandas pipelines.
+# The rows are reduced to the unique (word, tag) pairs, the pairs are looked up with the batch
+# methods (the dictionary first, then the OOV model for the rest) and the results are expanded
+# back to the rows with numpy indexing, so the per-row work is a dict lookup.
+logger = logging.getLogger(__name__)
+
+
+# Return an object array of the first lemma for each word and a bool array that's True where
+# the word wasn't in the dictionary (OOV).  upos can be a sequence or a single tag for all the
+# words.  Words without a lemma (ie.. OOV with lemmatize_oov=False, or invalid upos) and values
+# that aren't strings (ie.. None or NaN) are returned as is, or as None if on_empty_ret_word is
+# False.
+def getLemmaArray(words, upos, lemmatize_oov=True, on_empty_ret_word=True):
+    return _runColumns(Lemmatizer().getLemmaBatch, words, upos, lemmatize_oov, on_empty_ret_word,
+                       lambda tag: tag in Lemmatizer.DICT_UPOS_TYPES)
+
+# Same as above for the inflections of the lemmas for the Penn tags
+def getInflectionArray(lemmas, tags, inflect_oov=True, on_empty_ret_word=True):
+    return _runColumns(Inflections().getInflectionBatch, lemmas, tags, inflect_oov,
+                       on_empty_ret_word, lambda tag: tagToUPos(tag) in Inflections.DICT_UPOS_TYPES)
+
+
+def _runColumns(batch_func, words, tags, use_oov, on_empty_ret_word, is_valid_tag):
+    import numpy    # Lazy import numpy
+    words = numpy.asarray(words, dtype=object)
+    shape = words.shape
+    words = words.ravel()
+    if isinstance(tags, str):
+        tags = repeat(tags, len(words))
+    else:
+        tags = numpy.asarray(tags, dtype=object).ravel()
+        if len(tags) != len(words):
+            raise ValueError('Length of words (%d) and tags (%d) differ' % (len(words), len(tags)))
+    # Index of each row's unique (word, tag) pair
+    pairs = {}
+    setdefault = pairs.setdefault
+    inverse = numpy.fromiter((setdefault(p, len(pairs)) for p in zip(words, tags)),
+                             dtype=numpy.intp, count=len(words))
+    values, is_oov = _runUnique(batch_func, list(pairs), use_oov, on_empty_ret_word,
+                                is_valid_tag)
+    return values[inverse].reshape(shape), is_oov[inverse].reshape(shape)
+
+# Look up the unique (word, tag) pairs.  The dictionary is checked for all of them first so
+# the misses can be flagged as OOV.  Invalid tags and words that aren't strings (ie.. None or
+# NaN for missing values) are skipped (they're not flagged as OOV).
+def _runUnique(batch_func, pairs, use_oov, on_empty_ret_word, is_valid_tag):
+    import numpy    # Lazy import numpy
+    values = numpy.empty(len(pairs), dtype=object)
+    is_oov = numpy.zeros(len(pairs), dtype=bool)
+    valid  = []
+    num_invalid_tags = 0
+    for i, (word, tag) in enumerate(pairs):
+        values[i] = word if on_empty_ret_word else None
+        if not isinstance(word, str):
+            continue
+        if isinstance(tag, str) and is_valid_tag(tag):
+            valid.append(i)
+        else:
+            num_invalid_tags += 1
+    if num_invalid_tags:
+        logger.warning('Skipped %d unique words with invalid tags', num_invalid_tags)
+    results = batch_func([pairs[i][0] for i in valid], [pairs[i][1] for i in valid], False)
+    oov_idxs = [i for i, forms in zip(valid, results) if not forms]
+    is_oov[oov_idxs] = True
+    if use_oov and oov_idxs:
+        results = dict(zip(valid, results))
+        oov_results = batch_func([pairs[i][0] for i in oov_idxs], [pairs[i][1] for i in oov_idxs],
+                                 True)
+        results.update(zip(oov_idxs, oov_results))
+        results = [results[i] for i in valid]
+    for i, forms in zip(valid, results):
+        if forms:
+            values[i] = forms[0]
+    return values, is_oov
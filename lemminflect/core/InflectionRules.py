@@ -3,25 +3,55 @@ from   ..slexicon.SKey import *
 from   ..kmodels.KInfer import getKInferInstance
 from   ..kmodels.ModelInflInData import ModelInflInData
 from   .LexicalUtils import uposToCategory
+from   ..utils.LRUCache import LRUCache
 from   lemminflect import config
 
 
 # This contains a number of rules for doing simple inflections.
 # These rules are derived from SPECIALIST Lexicon documentation
 class MorphologyStyleModel(object):
-    def __init__(self, kitype=config.kinfer_type, model_fn=config.model_infl_fn):
-        self.kinfer = getKInferInstance(kitype, model_fn)
+    # kitype defaults to config.kinfer_type at the time the object is created.
+    # Pass in kinfer to use an existing inference engine instead of loading one.
+    def __init__(self, kitype=None, model_fn=config.model_infl_fn, kinfer=None):
+        if kinfer is None:
+            kinfer = getKInferInstance(kitype or config.kinfer_type, model_fn, config.kinfer_precision)
+        self.kinfer = kinfer
         self.output_classes = self.kinfer.getOutputEnum()
+        # Styles from the model, keyed by the encoded suffix and category of the lemma
+        self.cache = LRUCache(config.oov_cache_size)
+        self.counters = None    # the Inflections' usage counters when they're enabled
 
     # Get the morphology style, reg, regd or glreg
     def getStyle(self, lemma, upos):
-        category = uposToCategory(upos)
-        try:
-            vec = ModelInflInData.wordToVec(lemma, category)
-        except ValueError:
-            return None
-        _, style = self.kinfer.run(vec)
-        return style
+        return self.getStyleBatch([lemma], [upos])[0]
+
+    # Get the morphology style for a list of lemmas with a single pass through the model.
+    # Lemmas that share a key are only run once.
+    # Returns a list of styles with None for any lemma that couldn't be encoded.
+    def getStyleBatch(self, lemmas, upos_list):
+        styles = [None]*len(lemmas)
+        misses = {}     # key -> list of lemma indexes
+        for i, (lemma, upos) in enumerate(zip(lemmas, upos_list)):
+            category = uposToCategory(upos)
+            if not ModelInflInData.isValidCategory(category):
+                continue
+            key   = ModelInflInData.wordToKey(lemma, category)
+            style = self.cache.get(key)
+            if style is None:
+                misses.setdefault(key, []).append(i)
+            else:
+                styles[i] = style
+        if misses:
+            counters = self.counters
+            if counters is not None:
+                counters.incr('oov_model_runs')
+                counters.incr('oov_model_keys', len(misses))
+            _, batch_styles = self.kinfer.runKeys(list(misses))
+            for (key, idxs), style in zip(misses.items(), batch_styles):
+                self.cache.put(key, style)
+                for i in idxs:
+                    styles[i] = style
+        return styles
 
 
 class InflectionRules(object):
@@ -1,11 +1,19 @@
+import time
+import threading
 import logging
-from   copy import deepcopy
+from   types import MappingProxyType
 from   ..utils.Singleton import Singleton
+from   ..utils.LRUCache  import LRUCache
+from   ..utils.Interning import LookupInterner
+from   ..utils.StatsCounters import StatsCounters
 from   .InflectionRules  import InflectionRules, MorphologyStyleModel
 from   .LexicalUtils     import pennTagAlts, tagToUPos, uposToTags
 from   .LexicalUtils     import getCapsStyle, applyCapsStyleToDict, applyCapsStyle
+from   .LexicalUtils     import dictHasCapsStyle
 from   ..codecs.InflectionLUCodec import InflectionLUCodec
+from   ..codecs.LexiconBinCodec import LexiconBinCodec, MappedLexicon
 from   ..codecs.OverridesCodec import OverridesCodec
+from   .UnifiedLexicon import UnifiedLexicon
 from   .Lemmatizer import Lemmatizer
 from   .. import config
 
@@ -18,7 +26,14 @@ class Inflections(Singleton):
         self.infl_lu_fn = infl_lu_fn
         self.overrides_fn = overrides_fn
         self.logger = logging.getLogger(__name__)
+        self.load_lock = threading.RLock()  # for the lazy loaders
+        self.intern_bytes_saved = 0         # memory saved by config.lu_intern
+        self.load_secs = {}                 # time to load each resource
+        self.counters = None                # usage counters when enabled (see setCollectStats)
         self.setUseInternalLemmatizer(True)     # only for _spacyGetInfl
+        self.setReadOnlyResults(False)
+        self.setCollectStats(config.collect_stats)
+        self.cache = LRUCache(config.infl_cache_size)    # for getInflection results
 
     # Pass in the lemmatizer or None to use spaCy's
     def setUseInternalLemmatizer(self, TF):
@@ -30,43 +45,108 @@ class Inflections(Singleton):
     def isUsingInternalLemmatizer(self):
         return self.int_lemma is not None
 
+    # If True, getAllInflections returns a read-only view of the stored data instead of a
+    # new dict.  The data is only copied when the caps style of the lemma requires it.
+    def setReadOnlyResults(self, TF):
+        self.read_only = bool(TF)
+
+    def isReadOnlyResults(self):
+        return self.read_only
+
+    # Enable or disable the usage counters.  Disabling them discards the counts.  The OOV model
+    # uses the same counters, for the times it's run.
+    def setCollectStats(self, TF):
+        if not TF:
+            self.counters = None
+        elif self.counters is None:
+            self.counters = StatsCounters()
+        if hasattr(self, 'morph_style_model'):
+            self.morph_style_model.counters = self.counters
+
+    # Return a dict of the usage counters (empty if they're disabled), the load times and the
+    # memory saved by interning
+    def stats(self):
+        counters = self.counters
+        return {'counters':counters.snapshot() if counters is not None else {},
+                'load_secs':dict(self.load_secs),
+                'intern_bytes_saved':self.intern_bytes_saved}
+
+    # Set the maximum number of getInflection results cached.  0 disables the cache.
+    def setCacheSize(self, maxsize):
+        self.cache.setMaxSize(maxsize)
+
+    # Clear the getInflection cache and the OOV model's cache
+    def clearCache(self):
+        self.cache.clear()
+        if hasattr(self, 'morph_style_model'):
+            self.morph_style_model.cache.clear()
+
+    # Returns a named tuple with hits, misses, maxsize and currsize
+    def cacheInfo(self):
+        return self.cache.cacheInfo()
+
+    # Same as above for the OOV model's cache or None if the model isn't loaded yet
+    def oovCacheInfo(self):
+        if hasattr(self, 'morph_style_model'):
+            return self.morph_style_model.cache.cacheInfo()
+        return None
+
     # Get all inflections in the DB
     # Note that the lower-case version of the word is used for lookup so if this is
     # a capitalized proper-noun, then upos must be 'PROPN'
     # Return a dictionary of forms with the Penn Treebank tag as the key and a tuple
     # of the possible spellings as the valueif token.pos_ in self.DICT_UPOS_TYPES:
     def getAllInflections(self, lemma, upos=None):
+        counters = self.counters
         if upos is not None and upos not in self.DICT_UPOS_TYPES:
             self.logger.warning('Invalid upos type = %s', upos)
-            return {}
+            if counters is not None:
+                counters.incr('invalid_upos')
+            return MappingProxyType({}) if self.read_only else {}
         caps_style = getCapsStyle(lemma)
         lemma = lemma.lower()
         if upos == 'PROPN':
             lemma = applyCapsStyle(lemma, 'first_upper')
             upos = 'NOUN'   # infl_dict originally has category which only has 'noun'
+            if counters is not None:
+                counters.incr('propn_conversions')
         # Get the forms for the lemma from the main database
-        forms = deepcopy(self._getInflDict().get(lemma, {}))
-        # Apply any overrides
-        overrides = deepcopy(self._getOverridesDict().get(lemma, {}))
-        forms.update( overrides )
+        # Values are tuples of strings so the stored dicts can be shared without a deep copy.
+        # Overrides were merged into the dict when loaded.
+        forms = self._getInflDict().get(lemma, {})
         # If there's a upos defined then return only those types
         if upos is not None:
             candidate_tags = uposToTags(upos)
-            for key in list(forms.keys()):
-                if key not in candidate_tags:
-                    del forms[key]
-        forms = applyCapsStyleToDict(forms, caps_style)
+            forms = {k:v for k, v in forms.items() if k in candidate_tags}
+        if counters is not None:
+            self._countLookup(counters, lemma, forms)
+        if self.read_only:
+            if not dictHasCapsStyle(forms, caps_style):
+                forms = applyCapsStyleToDict(dict(forms), caps_style)
+            return MappingProxyType(forms)
+        forms = applyCapsStyleToDict(dict(forms), caps_style)
         return forms
 
     # Get all inflections using the Inflection Rules
     # Return a dictionary of inflections, keyed by Penn Tag  and a tuple
     # of the possible spellings as the value
     def getAllInflectionsOOV(self, lemma, upos):
+        counters = self.counters
         if upos not in self.DICT_UPOS_TYPES:
             self.logger.warning('Invalid upos type = %s', upos)
+            if counters is not None:
+                counters.incr('invalid_upos')
             return {}
-        caps_style = getCapsStyle(lemma)
+        if counters is not None:
+            counters.incr('oov_requests')
+            counters.incr('oov_words')
         morph_style = self._getInflStyleModel().getStyle(lemma, upos)
+        return self._buildOOVForms(lemma, upos, morph_style)
+
+    # Apply the inflection rules for the morphology style from the model
+    @staticmethod
+    def _buildOOVForms(lemma, upos, morph_style):
+        caps_style = getCapsStyle(lemma)
         if upos == 'VERB':
             if morph_style == 'reg':
                 verbs = InflectionRules.buildRegVerb(lemma)
@@ -96,7 +176,77 @@ class Inflections(Singleton):
 
     # Get a single inflections for the tag.  Use OOV rules if needed.
     # Return a tuple of possible spellings
+    # Results are cached, keyed by the exact input (case included).
     def getInflection(self, lemma, tag, inflect_oov=True):
+        key = (lemma, tag, bool(inflect_oov))
+        form = self.cache.get(key)
+        if form is None:
+            form = self._getInflection(lemma, tag, inflect_oov)
+            # Invalid tags aren't cached so the warning is logged on every call
+            if tagToUPos(tag) in self.DICT_UPOS_TYPES:
+                self.cache.put(key, form)
+        return form
+
+    def _getInflection(self, lemma, tag, inflect_oov):
+        upos = tagToUPos(tag)
+        form = self._getDictInflection(lemma, tag, upos)
+        # If still nothing, inflect oov
+        if form is None and inflect_oov:
+            forms = self.getAllInflectionsOOV(lemma, upos)      # caps style preserved here
+            form = self._extractForm(forms, tag)
+        if form is None:
+            return ()
+        return form
+
+    # Get inflections for a list of lemmas and their Penn tags.  Dictionary hits are resolved
+    # first and then all the OOV lemmas are run through the morphology model in a single batch.
+    # Returns a list of tuples (the same as getInflection would) in the order of the input.
+    def getInflectionBatch(self, lemmas, tags, inflect_oov=True):
+        if len(lemmas) != len(tags):
+            raise ValueError('Length of lemmas (%d) and tags (%d) differ' % \
+                (len(lemmas), len(tags)))
+        cache = self.cache
+        counters = self.counters
+        inflect_oov = bool(inflect_oov)
+        results  = [()]*len(lemmas)
+        new_idxs = []
+        oov_idxs = []
+        for i, (lemma, tag) in enumerate(zip(lemmas, tags)):
+            form = cache.get((lemma, tag, inflect_oov))
+            if form is not None:
+                results[i] = form
+                continue
+            upos = tagToUPos(tag)
+            form = self._getDictInflection(lemma, tag, upos)
+            if form is not None:
+                results[i] = form
+            elif inflect_oov:
+                if upos not in self.DICT_UPOS_TYPES:
+                    self.logger.warning('Invalid upos type = %s', upos)
+                    if counters is not None:
+                        counters.incr('invalid_upos')
+                    continue
+                oov_idxs.append(i)
+            if upos in self.DICT_UPOS_TYPES:
+                new_idxs.append(i)
+        # Run all the OOV lemmas through the model together
+        if oov_idxs:
+            oov_lemmas = [lemmas[i] for i in oov_idxs]
+            oov_upos   = [tagToUPos(tags[i]) for i in oov_idxs]
+            if counters is not None:
+                counters.incr('oov_requests')
+                counters.incr('oov_words', len(oov_lemmas))
+            styles = self._getInflStyleModel().getStyleBatch(oov_lemmas, oov_upos)
+            for i, lemma, upos, style in zip(oov_idxs, oov_lemmas, oov_upos, styles):
+                forms = self._buildOOVForms(lemma, upos, style)
+                results[i] = self._extractForm(forms, tags[i]) or ()
+        for i in new_idxs:
+            cache.put((lemmas[i], tags[i], inflect_oov), results[i])
+        return results
+
+    # Get the inflection from the dictionary, trying alternate tags if needed.
+    # Returns None if nothing is found.
+    def _getDictInflection(self, lemma, tag, upos):
         # Get the forms for the lemma from the main database
         # and use the treebank tag to find the correct return value
         # If we don't find anything in the dictionary, use the rules
@@ -105,7 +255,6 @@ class Inflections(Singleton):
         # know if a noun's proper.  However, we don't want to limit the return
         # to a specific upos, otherwise the alternate tags below won't work.  We don't
         # need those for proper nouns so only pass in upos for 'PROPN'.
-        upos = tagToUPos(tag)
         if upos == 'PROPN':
             forms = self.getAllInflections(lemma, upos)  # caps style preserved here
         else:
@@ -118,13 +267,9 @@ class Inflections(Singleton):
             for alt_tag in pennTagAlts(tag):
                 form = forms.get(alt_tag, None)
                 if form:
+                    if self.counters is not None:
+                        self.counters.incr('tag_alt_fallbacks')
                     break
-        # If still nothing, inflect oov
-        if form is None and inflect_oov:
-            forms = self.getAllInflectionsOOV(lemma, upos)      # caps style preserved here
-            form = self._extractForm(forms, tag)
-        if form is None:
-            return ()
         return form
 
     # Reverse the proper-noun hack.  Since the corpus only has noun in it, the tags will
@@ -173,20 +318,73 @@ class Inflections(Singleton):
         else:
             return inflections[0]
 
+    # Check if the lookup value for the lemma/tag came from the overrides file
+    def isOverride(self, lemma, tag):
+        return tag in self._getOverridesDict().get(lemma, {})
+
+    # Count a dictionary lookup of the (lower-cased) lemma.  forms is the {tag:forms} found.
+    def _countLookup(self, counters, lemma, forms):
+        if not forms:
+            counters.incr('dict_misses')
+            return
+        counters.incr('dict_hits')
+        overrides = self._getOverridesDict().get(lemma)
+        if overrides and any(tag in overrides for tag in forms):
+            counters.incr('override_hits')
+
+    # Use lookup data in the LexiconBinCodec format from a buffer (ie.. shared memory) instead
+    # of loading the file.  If kinfer is not None, it's used as the OOV model's inference engine.
+    # The caches are cleared since they hold results from the previous data.
+    def setSharedData(self, lu_buf, kinfer=None):
+        with self.load_lock:
+            self.infl_dict = OverridesCodec.apply(MappedLexicon(lu_buf), self._getOverridesDict())
+            if kinfer is not None:
+                self.morph_style_model = MorphologyStyleModel(kinfer=kinfer)
+                self.morph_style_model.counters = self.counters
+            self.clearCache()
+
     # Lazy load inflection data and only do it once
+    # The overrides are merged in here so lookups only need to check a single dict.
     def _getInflDict(self):
         if not hasattr(self, 'infl_dict'):
-            self.infl_dict = InflectionLUCodec.load(self.infl_lu_fn)
+            with self.load_lock:
+                if not hasattr(self, 'infl_dict'):
+                    overrides_dict = self._getOverridesDict()
+                    st = time.perf_counter()
+                    infl_dict = None
+                    if config.lu_format == 'unified':
+                        infl_dict = UnifiedLexicon().getInflDict()
+                    elif config.lu_format == 'mmap':
+                        infl_dict = LexiconBinCodec.loadForCSV(self.infl_lu_fn)
+                    if infl_dict is None:
+                        interner = LookupInterner() if config.lu_intern else None
+                        infl_dict = InflectionLUCodec.load(self.infl_lu_fn, interner)
+                        if interner is not None:
+                            self.intern_bytes_saved = interner.bytes_saved
+                            self.logger.info('Interning %s saved %d bytes', self.infl_lu_fn, \
+                                interner.bytes_saved)
+                    self.infl_dict = OverridesCodec.apply(infl_dict, overrides_dict)
+                    self.load_secs['infl_lu'] = time.perf_counter() - st
         return self.infl_dict
 
     # Lazy load overrides
     def _getOverridesDict(self):
         if not hasattr(self, 'overrides_dict'):
-            self.overrides_dict = OverridesCodec.load(self.overrides_fn)
+            with self.load_lock:
+                if not hasattr(self, 'overrides_dict'):
+                    st = time.perf_counter()
+                    self.overrides_dict = OverridesCodec.load(self.overrides_fn)
+                    self.load_secs['overrides'] = time.perf_counter() - st
         return self.overrides_dict
 
     # Lazy load inflection model and only do it once
     def _getInflStyleModel(self):
         if not hasattr(self, 'morph_style_model'):
-            self.morph_style_model = MorphologyStyleModel()
+            with self.load_lock:
+                if not hasattr(self, 'morph_style_model'):
+                    st = time.perf_counter()
+                    morph_style_model = MorphologyStyleModel()
+                    morph_style_model.counters = self.counters
+                    self.morph_style_model = morph_style_model
+                    self.load_secs['oov_model'] = time.perf_counter() - st
         return self.morph_style_model
@@ -1,9 +1,17 @@
+import time
+import threading
 import logging
-from copy import deepcopy
+from types import MappingProxyType
 from .LexicalUtils           import getCapsStyle, applyCapsStyle, applyCapsStyleToDict
+from .LexicalUtils           import dictHasCapsStyle
 from ..utils.Singleton       import Singleton
+from ..utils.LRUCache        import LRUCache
+from ..utils.Interning       import LookupInterner
+from ..utils.StatsCounters   import StatsCounters
 from ..codecs.LemmaLUCodec   import LemmaLUCodec
+from ..codecs.LexiconBinCodec import LexiconBinCodec, MappedLexicon
 from ..codecs.OverridesCodec import OverridesCodec
+from .UnifiedLexicon         import UnifiedLexicon
 from .LemmatizerRules        import LemmatizerRules
 from .. import config
 
@@ -15,6 +23,59 @@ class Lemmatizer(Singleton):
         self.lemma_lu_fn = lemma_lu_fn
         self.overrides_fn = overrides_fn
         self.logger = logging.getLogger(__name__)
+        self.load_lock = threading.RLock()  # for the lazy loaders
+        self.intern_bytes_saved = 0         # memory saved by config.lu_intern
+        self.load_secs = {}                 # time to load each resource
+        self.counters = None                # usage counters when enabled (see setCollectStats)
+        self.setReadOnlyResults(False)
+        self.setCollectStats(config.collect_stats)
+        self.cache = LRUCache(config.lemma_cache_size)   # for getLemma results
+
+    # Set the maximum number of getLemma results cached.  0 disables the cache.
+    def setCacheSize(self, maxsize):
+        self.cache.setMaxSize(maxsize)
+
+    # Clear the getLemma cache and the OOV model's cache
+    def clearCache(self):
+        self.cache.clear()
+        if hasattr(self, 'oov_lemmatizer'):
+            self.oov_lemmatizer.cache.clear()
+
+    # Returns a named tuple with hits, misses, maxsize and currsize
+    def cacheInfo(self):
+        return self.cache.cacheInfo()
+
+    # Same as above for the OOV model's cache or None if the model isn't loaded yet
+    def oovCacheInfo(self):
+        if hasattr(self, 'oov_lemmatizer'):
+            return self.oov_lemmatizer.cache.cacheInfo()
+        return None
+
+    # If True, getAllLemmas returns a read-only view of the stored data instead of a new dict.
+    # The data is only copied when the caps style of the word requires the lemmas to change.
+    def setReadOnlyResults(self, TF):
+        self.read_only = bool(TF)
+
+    def isReadOnlyResults(self):
+        return self.read_only
+
+    # Enable or disable the usage counters.  Disabling them discards the counts.  The OOV model
+    # uses the same counters, for the times it's run.
+    def setCollectStats(self, TF):
+        if not TF:
+            self.counters = None
+        elif self.counters is None:
+            self.counters = StatsCounters()
+        if hasattr(self, 'oov_lemmatizer'):
+            self.oov_lemmatizer.counters = self.counters
+
+    # Return a dict of the usage counters (empty if they're disabled), the load times and the
+    # memory saved by interning
+    def stats(self):
+        counters = self.counters
+        return {'counters':counters.snapshot() if counters is not None else {},
+                'load_secs':dict(self.load_secs),
+                'intern_bytes_saved':self.intern_bytes_saved}
 
     # Get all lemmas for the specific word.
     # upos is the universal dependencies of NOUN, PROPN, VERB, etc..
@@ -23,23 +84,33 @@ class Lemmatizer(Singleton):
     # Returns a dict with upos as key and a tuple of spellings for the values
     # The returned lemmas are capitalized the same was as the incoming word.
     def getAllLemmas(self, word, upos=None):
+        counters = self.counters
         if upos is not None and upos not in self.DICT_UPOS_TYPES:
             self.logger.warning('Invalid upos type = %s', upos)
-            return {}
+            if counters is not None:
+                counters.incr('invalid_upos')
+            return MappingProxyType({}) if self.read_only else {}
         caps_style = getCapsStyle(word)
         word = word.lower()
         if upos == 'PROPN':
             word = applyCapsStyle(word, 'first_upper')
             upos = 'NOUN'   # lu_dict originally has category which only has 'noun'
+            if counters is not None:
+                counters.incr('propn_conversions')
         # Note that lemma dict tags are converted from category to upos on load
-        lemmas = deepcopy(self._getLemmaDict().get(word, {}))
-        # Apply any overrides
-        overrides = deepcopy(self._getOverridesDict().get(word, {}))
-        lemmas.update( overrides )
+        # Values are tuples of strings so the stored dicts can be shared without a deep copy.
+        # Overrides were merged into the dict when loaded.
+        lemmas = self._getLemmaDict().get(word, {})
         # If a upos is provided, filter for it
         if upos:
-            lemmas = {k:v for k,v in lemmas.items() if k==upos}
-        lemmas = applyCapsStyleToDict(lemmas, caps_style)
+            lemmas = {upos:lemmas[upos]} if upos in lemmas else {}
+        if counters is not None:
+            self._countLookup(counters, word, lemmas)
+        if self.read_only:
+            if not dictHasCapsStyle(lemmas, caps_style):
+                lemmas = applyCapsStyleToDict(dict(lemmas), caps_style)
+            return MappingProxyType(lemmas)
+        lemmas = applyCapsStyleToDict(dict(lemmas), caps_style)
         return lemmas
 
     # Get the lemma for the specific word.  Case of the word won't impact lemmatization
@@ -48,9 +119,15 @@ class Lemmatizer(Singleton):
     # Return is purposely the same as getAllLemmas so this returns a dict
     # with upos as key and a tuple of the spelling
     def getAllLemmasOOV(self, word, upos):
+        counters = self.counters
         if upos not in self.DICT_UPOS_TYPES:
             self.logger.warning('Invalid upos type = %s', upos)
+            if counters is not None:
+                counters.incr('invalid_upos')
             return {}
+        if counters is not None:
+            counters.incr('oov_requests')
+            counters.incr('oov_words')
         caps_style = getCapsStyle(word)
         lemma = self._getOOVLemmatizer().lemmatize(word, upos)
         if lemma is None:
@@ -60,15 +137,80 @@ class Lemmatizer(Singleton):
 
     # Get the lemma(s) for the upos.  Use OOV rules if needed.
     # Return a tuple of various spellings or an empty set
+    # Results are cached, keyed by the exact input (case included).
     def getLemma(self, word, upos, lemmatize_oov=True):
+        key = (word, upos, bool(lemmatize_oov))
+        lemmas = self.cache.get(key)
+        if lemmas is not None:
+            return lemmas
         lemma_dict = self.getAllLemmas(word, upos)          # caps style preserved here
         if not lemma_dict and lemmatize_oov:
             lemma_dict = self.getAllLemmasOOV(word, upos)   # caps style preserved here
         if not lemma_dict:
-            return ()
+            lemmas = ()
         elif len(lemma_dict) == 1:
-            return list(lemma_dict.values())[0]  # dict has only 1 value, but the value is a tuple
-        assert False, 'More than 1 category value in lemmas: %s' % str(lemma_dict)
+            lemmas = list(lemma_dict.values())[0]  # dict has only 1 value, but the value is a tuple
+        else:
+            assert False, 'More than 1 category value in lemmas: %s' % str(lemma_dict)
+        # Invalid upos types aren't cached so the warning is logged on every call
+        if upos in self.DICT_UPOS_TYPES:
+            self.cache.put(key, lemmas)
+        return lemmas
+
+    # Get the lemmas for a list of words and their upos tags.  Dictionary hits are resolved
+    # first and then all the OOV words are run through the rules model in a single batch.
+    # Returns a list of tuples (the same as getLemma would) in the order of the input words.
+    def getLemmaBatch(self, words, upos_list, lemmatize_oov=True):
+        if len(words) != len(upos_list):
+            raise ValueError('Length of words (%d) and upos_list (%d) differ' % \
+                (len(words), len(upos_list)))
+        lemma_dict = self._getLemmaDict()
+        cache = self.cache
+        counters = self.counters
+        lemmatize_oov = bool(lemmatize_oov)
+        results  = [()]*len(words)
+        new_idxs = []
+        oov_idxs = []
+        for i, (word, upos) in enumerate(zip(words, upos_list)):
+            if upos not in self.DICT_UPOS_TYPES:
+                self.logger.warning('Invalid upos type = %s', upos)
+                if counters is not None:
+                    counters.incr('invalid_upos')
+                continue
+            lemmas = cache.get((word, upos, lemmatize_oov))
+            if lemmas is not None:
+                results[i] = lemmas
+                continue
+            new_idxs.append(i)
+            caps_style = getCapsStyle(word)
+            key = word.lower()
+            dict_upos = upos
+            if upos == 'PROPN':
+                key = applyCapsStyle(key, 'first_upper')
+                dict_upos = 'NOUN'
+                if counters is not None:
+                    counters.incr('propn_conversions')
+            lemmas = lemma_dict.get(key, {}).get(dict_upos)
+            if counters is not None:
+                self._countLookup(counters, key, {dict_upos:lemmas} if lemmas else {})
+            if lemmas:
+                results[i] = tuple(applyCapsStyle(l, caps_style) for l in lemmas)
+            elif lemmatize_oov:
+                oov_idxs.append(i)
+        # Run all the OOV words through the model together
+        if oov_idxs:
+            oov_words = [words[i] for i in oov_idxs]
+            oov_upos  = [upos_list[i] for i in oov_idxs]
+            if counters is not None:
+                counters.incr('oov_requests')
+                counters.incr('oov_words', len(oov_words))
+            lemmas = self._getOOVLemmatizer().lemmatizeBatch(oov_words, oov_upos)
+            for i, word, lemma in zip(oov_idxs, oov_words, lemmas):
+                if lemma is not None:
+                    results[i] = (applyCapsStyle(lemma, getCapsStyle(word)),)
+        for i in new_idxs:
+            cache.put((words[i], upos_list[i], lemmatize_oov), results[i])
+        return results
 
     # Look at the Penn tag to see if a word is already in its base form
     @staticmethod
@@ -101,20 +243,73 @@ class Lemmatizer(Singleton):
         else:
             return lemmas[0]
 
+    # Check if the lookup value for the word/upos came from the overrides file
+    def isOverride(self, word, upos):
+        return upos in self._getOverridesDict().get(word, {})
+
+    # Count a dictionary lookup of the (lower-cased) word.  lemmas is the {upos:lemmas} found.
+    def _countLookup(self, counters, word, lemmas):
+        if not lemmas:
+            counters.incr('dict_misses')
+            return
+        counters.incr('dict_hits')
+        overrides = self._getOverridesDict().get(word)
+        if overrides and any(upos in overrides for upos in lemmas):
+            counters.incr('override_hits')
+
+    # Use lookup data in the LexiconBinCodec format from a buffer (ie.. shared memory) instead
+    # of loading the file.  If kinfer is not None, it's used as the OOV model's inference engine.
+    # The caches are cleared since they hold results from the previous data.
+    def setSharedData(self, lu_buf, kinfer=None):
+        with self.load_lock:
+            self.lemma_dict = OverridesCodec.apply(MappedLexicon(lu_buf), self._getOverridesDict())
+            if kinfer is not None:
+                self.oov_lemmatizer = LemmatizerRules(kinfer=kinfer)
+                self.oov_lemmatizer.counters = self.counters
+            self.clearCache()
+
     # Lazy load dictionary and only do it only once
+    # The overrides are merged in here so lookups only need to check a single dict.
     def _getLemmaDict(self):
         if not hasattr(self, 'lemma_dict'):
-            self.lemma_dict = LemmaLUCodec.load(self.lemma_lu_fn)
+            with self.load_lock:
+                if not hasattr(self, 'lemma_dict'):
+                    overrides_dict = self._getOverridesDict()
+                    st = time.perf_counter()
+                    lemma_dict = None
+                    if config.lu_format == 'unified':
+                        lemma_dict = UnifiedLexicon().getLemmaDict()
+                    elif config.lu_format == 'mmap':
+                        lemma_dict = LexiconBinCodec.loadForCSV(self.lemma_lu_fn)
+                    if lemma_dict is None:
+                        interner = LookupInterner() if config.lu_intern else None
+                        lemma_dict = LemmaLUCodec.load(self.lemma_lu_fn, interner)
+                        if interner is not None:
+                            self.intern_bytes_saved = interner.bytes_saved
+                            self.logger.info('Interning %s saved %d bytes', self.lemma_lu_fn, \
+                                interner.bytes_saved)
+                    self.lemma_dict = OverridesCodec.apply(lemma_dict, overrides_dict)
+                    self.load_secs['lemma_lu'] = time.perf_counter() - st
         return self.lemma_dict
 
     # Lazy load the overrides
     def _getOverridesDict(self):
         if not hasattr(self, 'overrides_dict'):
-            self.overrides_dict = OverridesCodec.load(self.overrides_fn)
+            with self.load_lock:
+                if not hasattr(self, 'overrides_dict'):
+                    st = time.perf_counter()
+                    self.overrides_dict = OverridesCodec.load(self.overrides_fn)
+                    self.load_secs['overrides'] = time.perf_counter() - st
         return self.overrides_dict
 
     # Lazy load the lemmatizer and only do it only once
     def _getOOVLemmatizer(self):
         if not hasattr(self, 'oov_lemmatizer'):
-            self.oov_lemmatizer = LemmatizerRules()
+            with self.load_lock:
+                if not hasattr(self, 'oov_lemmatizer'):
+                    st = time.perf_counter()
+                    oov_lemmatizer = LemmatizerRules()
+                    oov_lemmatizer.counters = self.counters
+                    self.oov_lemmatizer = oov_lemmatizer
+                    self.load_secs['oov_model'] = time.perf_counter() - st
         return self.oov_lemmatizer
@@ -2,24 +2,64 @@
 from   ..kmodels.ModelLemmaInData import ModelLemmaInData
 from   ..kmodels.KInfer           import getKInferInstance
 from   .LexicalUtils              import uposToCategory
+from   ..utils.LRUCache           import LRUCache
 from   .. import config
 
 
 class LemmatizerRules(object):
-    def __init__(self, kitype=config.kinfer_type, model_fn=config.model_lemma_fn):
-        self.kinfer = getKInferInstance(kitype, model_fn)
+    # kitype defaults to config.kinfer_type at the time the object is created.
+    # Pass in kinfer to use an existing inference engine instead of loading one.
+    def __init__(self, kitype=None, model_fn=config.model_lemma_fn, kinfer=None):
+        if kinfer is None:
+            kinfer = getKInferInstance(kitype or config.kinfer_type, model_fn, config.kinfer_precision)
+        self.kinfer = kinfer
         self.rules = self.kinfer.getOutputEnum()
+        # Rule numbers from the model, keyed by the encoded suffix and category of the word
+        self.cache = LRUCache(config.oov_cache_size)
+        self.counters = None    # the Lemmatizer's usage counters when they're enabled
 
     def lemmatize(self, word, upos):
-        category = uposToCategory(upos)
-        try:
-            vec = ModelLemmaInData.wordToVec(word, category)
-        except ValueError:
+        rnum = self._getRuleNums([word], [uposToCategory(upos)])[0]
+        if rnum is None:
             return None
-        rnum, _ = self.kinfer.run(vec)
         lemma = self._applyRule(word, rnum)
         return lemma
 
+    # Lemmatize a list of words with a single pass through the model.
+    # Returns a list of lemmas with None for any word that couldn't be encoded.
+    def lemmatizeBatch(self, words, upos_list):
+        rnums = self._getRuleNums(words, [uposToCategory(upos) for upos in upos_list])
+        return [None if rnum is None else self._applyRule(word, rnum) \
+                for word, rnum in zip(words, rnums)]
+
+    # Get the rule number for each word, from the cache or by running the model on the ones
+    # not in it.  Words that share a key are only run once.
+    # Returns None for words with a category the model doesn't handle.
+    def _getRuleNums(self, words, categories):
+        rnums  = [None]*len(words)
+        misses = {}     # key -> list of word indexes
+        for i, (word, category) in enumerate(zip(words, categories)):
+            if not ModelLemmaInData.isValidCategory(category):
+                continue
+            key  = ModelLemmaInData.wordToKey(word, category)
+            rnum = self.cache.get(key)
+            if rnum is None:
+                misses.setdefault(key, []).append(i)
+            else:
+                rnums[i] = rnum
+        if misses:
+            counters = self.counters
+            if counters is not None:
+                counters.incr('oov_model_runs')
+                counters.incr('oov_model_keys', len(misses))
+            batch_rnums, _ = self.kinfer.runKeys(list(misses))
+            for (key, idxs), rnum in zip(misses.items(), batch_rnums):
+                rnum = int(rnum)
+                self.cache.put(key, rnum)
+                for i in idxs:
+                    rnums[i] = rnum
+        return rnums
+
     # Apply a rule to an inflection
     def _applyRule(self, inflection, rnum):
         rule = self.rules[rnum]
@@ -129,3 +129,15 @@ def applyCapsStyleToDict(data, style):
         else:
             data[key] = applyCapsStyle(words, style)
     return data
+
+# Check if all the words in the dictionary values already have the caps style
+# so that the dictionary can be returned without rebuilding it.
+def dictHasCapsStyle(data, style):
+    for words in data.values():
+        if isinstance(words, (list, tuple)):
+            for w in words:
+                if applyCapsStyle(w, style) != w:
+                    return False
+        elif applyCapsStyle(words, style) != words:
+            return False
+    return True
@@ -0,0 +1,68 @@
+import time
+import logging
+import threading
+from   .Lemmatizer  import Lemmatizer
+from   .Inflections import Inflections
+
+# Lazy loaders for each of the components that can be preloaded
+LOADERS = {'lemma'          : lambda: Lemmatizer()._getLemmaDict(),
+           'lemma_oov'      : lambda: Lemmatizer()._getOOVLemmatizer(),
+           'inflection'     : lambda: Inflections()._getInflDict(),
+           'inflection_oov' : lambda: Inflections()._getInflStyleModel()}
+
+_threads = []   # background loading threads
+_errors  = []   # exceptions raised in the background threads
+_lock    = threading.Lock()
+
+
+# Load the data for the components (a list of LOADERS keys, None for all) now, instead of on
+# the first call that needs it.  The loaders are thread-safe so this can run while other threads
+# are making calls.  With background=True, the loading is done in a daemon thread and this returns
+# immediately.  Use waitUntilLoaded() to block until it's finished.
+def preload(components=None, background=False):
+    if components is None:
+        components = list(LOADERS)
+    for component in components:
+        if component not in LOADERS:
+            raise ValueError('Invalid component = %s.  Valid components are %s' % \
+                (component, list(LOADERS)))
+    if not background:
+        _load(components)
+        return
+    thread = threading.Thread(target=_loadInBackground, args=(components,),
+                              name='lemminflect-preload', daemon=True)
+    with _lock:
+        _threads.append(thread)
+    thread.start()
+
+# Wait for any background preloading to finish.  Returns False if it isn't finished after timeout
+# seconds (None waits forever), which applies to all the threads together.  Use a timeout of 0 to
+# check if it's done without blocking.
+# If the background loading failed, the exception is re-raised here, once.
+def waitUntilLoaded(timeout=None):
+    with _lock:
+        threads = list(_threads)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for thread in threads:
+        thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+        if thread.is_alive():
+            return False
+    with _lock:
+        _threads[:] = [t for t in _threads if t.is_alive()]
+        if _errors:
+            error = _errors[0]
+            del _errors[:]
+            raise error
+    return True
+
+def _load(components):
+    for component in components:
+        LOADERS[component]()
+
+def _loadInBackground(components):
+    try:
+        _load(components)
+    except Exception as e:
+        logging.getLogger(__name__).exception('Error preloading %s', components)
+        with _lock:
+            _errors.append(e)
@@ -0,0 +1,103 @@
+import os
+from   multiprocessing import shared_memory
+from   .Lemmatizer  import Lemmatizer
+from   .Inflections import Inflections
+from   ..codecs.LemmaLUCodec      import LemmaLUCodec
+from   ..codecs.InflectionLUCodec import InflectionLUCodec
+from   ..codecs.LexiconBinCodec   import LexiconBinCodec
+from   ..kmodels.Quantization     import loadQuantizedModel
+from   .. import config
+
+# Shared memory blocks created (published) or attached to by this process.  The attached blocks
+# need to stay referenced for as long as the data is in use.
+_published = []
+_attached  = []
+
+
+# Publish the lookup tables, in the LexiconBinCodec format, and the model weights into shared
+# memory so that worker processes can use them without loading their own copies.
+# Returns a dict of the block names and model meta-data (spec) to pass to attachSharedData() in
+# each worker.  The model weights are only published when config.kinfer_type is 'numpy'.  They're
+# published at config.kinfer_precision, so the workers use the same weights as this process.
+def publishSharedData():
+    spec = {}
+    spec['lemma_lu'] = _publishBytes(_getLUBytes(Lemmatizer().lemma_lu_fn, LemmaLUCodec))
+    spec['infl_lu']  = _publishBytes(_getLUBytes(Inflections().infl_lu_fn, InflectionLUCodec))
+    if config.kinfer_type == 'numpy':
+        spec['lemma_model'] = _publishModel(config.model_lemma_fn, config.kinfer_precision)
+        spec['infl_model']  = _publishModel(config.model_infl_fn, config.kinfer_precision)
+    return spec
+
+# Use the published data in this process.  This is normally called in the worker initializer.
+# Workers should be started with multiprocessing so they share the parent's resource tracker.
+def attachSharedData(spec):
+    kinfer = _attachModel(spec['lemma_model']) if 'lemma_model' in spec else None
+    Lemmatizer().setSharedData(_attach(spec['lemma_lu']).buf, kinfer)
+    kinfer = _attachModel(spec['infl_model']) if 'infl_model' in spec else None
+    Inflections().setSharedData(_attach(spec['infl_lu']).buf, kinfer)
+
+# Remove the published blocks.  Call this in the parent once the workers are finished.  The
+# memory is released when the last process using it exits.
+def unlinkSharedData():
+    while _published:
+        shm = _published.pop()
+        shm.unlink()
+        shm.close()
+
+
+# Get the binary version of the lookup table.  Use the compiled file if it exists, otherwise
+# build it from the csv.
+def _getLUBytes(lu_fn, codec):
+    bin_fn = LexiconBinCodec.getBinFilename(lu_fn)
+    if os.path.exists(bin_fn):
+        with open(bin_fn, 'rb') as f:
+            return f.read()
+    return LexiconBinCodec.toBytes(codec.load(lu_fn))
+
+# Copy the data into a new shared memory block and return its name
+def _publishBytes(data):
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    _published.append(shm)
+    shm.buf[:len(data)] = data
+    return shm.name
+
+# Copy the model weights, at the precision, into a single shared memory block.  The returned dict
+# has the block name plus everything needed to re-create the model from it.  The int8 scales are
+# small so they're passed in the dict.
+def _publishModel(model_fn, precision='float32'):
+    import numpy    # Lazy import numpy
+    meta, model_config, weights, scales = loadQuantizedModel(model_fn, precision)
+    weights = [numpy.ascontiguousarray(w) for w in weights]
+    offsets, pos = [], 0
+    for w in weights:
+        pos = (pos + 15) & ~15      # 16 byte align each array
+        offsets.append(pos)
+        pos += w.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(pos, 1))
+    _published.append(shm)
+    for w, offset in zip(weights, offsets):
+        shm.buf[offset:offset+w.nbytes] = w.tobytes()
+    return {'name':shm.name, 'meta':meta, 'config':model_config, 'precision':precision,
+            'scales':scales,
+            'weights':[(w.shape, w.dtype.str, offset) for w, offset in zip(weights, offsets)]}
+
+def _attach(name):
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)    # python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    _attached.append(shm)
+    return shm
+
+# Create the numpy inference engine with read-only weights backed by the shared memory
+def _attachModel(model_spec):
+    import numpy    # Lazy import numpy
+    from ..kmodels.KInfer import KInferWithNumpy
+    shm = _attach(model_spec['name'])
+    weights = []
+    for shape, dtype, offset in model_spec['weights']:
+        w = numpy.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        w.flags.writeable = False
+        weights.append(w)
+    return KInferWithNumpy(model_data=(model_spec['meta'], model_spec['config'], weights,
+                                       model_spec['scales']), precision=model_spec['precision'])
@@ -0,0 +1,69 @@
+from   itertools import islice
+from   .Lemmatizer import Lemmatizer
+
+# Name the lemmatizer component is registered under in spaCy
+LEMMATIZER_FACTORY = 'lemminflect_lemmatizer'
+
+
+# spaCy pipeline component that sets token.lemma_ for every token in the Doc.
+# Unlike the Token._.lemma() extension, which is called per token, the component collects
+# all the tokens (from a batch of docs when used with nlp.pipe) and lemmatizes them with a
+# single call to Lemmatizer.getLemmaBatch so all the OOV words go through the model together.
+# The lemmas are selected the same way as Lemmatizer.spacyGetLemma.  If on_empty_ret_word is
+# False, tokens that can't be lemmatized keep their existing lemma.
+class LemmatizerComponent(object):
+    def __init__(self, form_num=0, lemmatize_oov=True, on_empty_ret_word=True):
+        self.form_num = form_num
+        self.lemmatize_oov = lemmatize_oov
+        self.on_empty_ret_word = on_empty_ret_word
+
+    def __call__(self, doc):
+        self.lemmatizeDocs([doc])
+        return doc
+
+    # Called by nlp.pipe.  Docs are lemmatized batch_size at a time.
+    def pipe(self, stream, batch_size=128):
+        stream = iter(stream)
+        while True:
+            docs = list(islice(stream, batch_size))
+            if not docs:
+                break
+            self.lemmatizeDocs(docs)
+            yield from docs
+
+    # Set the lemma for all tokens in the list of docs
+    def lemmatizeDocs(self, docs):
+        lemmatizer = Lemmatizer()
+        tokens = []
+        for doc in docs:
+            for token in doc:
+                # Don't try to lemmatize words that are already in their base forms
+                if lemmatizer.isTagBaseForm(token.tag_):
+                    token.lemma_ = token.text
+                elif token.pos_ in lemmatizer.DICT_UPOS_TYPES:
+                    tokens.append(token)
+                elif self.on_empty_ret_word:
+                    token.lemma_ = token.text
+        lemmas_list = lemmatizer.getLemmaBatch([t.text for t in tokens], [t.pos_ for t in tokens],
+                                               self.lemmatize_oov)
+        form_num = self.form_num
+        for token, lemmas in zip(tokens, lemmas_list):
+            if lemmas:
+                token.lemma_ = lemmas[form_num] if len(lemmas) > form_num else lemmas[0]
+            elif self.on_empty_ret_word:
+                token.lemma_ = token.text
+
+
+# Register the components as spaCy factories so they can be added with
+# nlp.add_pipe('lemminflect_lemmatizer') (spaCy 3) or nlp.create_pipe (spaCy 2).
+def registerSpacyFactories(spacy):
+    from spacy.language import Language
+    if int(spacy.__version__.split('.')[0]) >= 3:
+        Language.factory(LEMMATIZER_FACTORY, func=createLemmatizerComponent,
+            default_config={'form_num':0, 'lemmatize_oov':True, 'on_empty_ret_word':True})
+    else:
+        Language.factories[LEMMATIZER_FACTORY] = lambda nlp, **cfg: LemmatizerComponent(**cfg)
+
+# Factory function with the signature spaCy 3 requires
+def createLemmatizerComponent(nlp, name, form_num, lemmatize_oov, on_empty_ret_word):
+    return LemmatizerComponent(form_num, lemmatize_oov, on_empty_ret_word)
@@ -0,0 +1,152 @@
+import threading
+from   collections.abc import Mapping
+from   .LexicalUtils import tagToUPos
+from   ..utils.Singleton import Singleton
+from   ..codecs.LemmaLUCodec import LemmaLUCodec
+from   ..codecs.InflectionLUCodec import InflectionLUCodec
+from   .. import config
+
+
+# A single store for the lemma and inflection lookup data, used when config.lu_format is
+# 'unified'.  lemma_lu is (almost) the inverse of infl_lu since both are built from the same
+# forms table, so instead of loading 2 complete copies of the lexicon, each paradigm is held once.
+#   forward : lemma -> {tag:(spellings,..)}, the same as the infl_lu dict
+#   inverse : form  -> references to the lemmas in the forward index
+# The lemma_lu entries are re-built from the paradigms when they're looked up.  Entries that
+# can't be re-built exactly (ie.. aux verbs or different lemma orders for each upos) are
+# stored as they are in lemma_lu.  All the strings are shared between the 2 indexes.
+# This is loaded from the files in config.
+class UnifiedLexicon(Singleton):
+    def __init__(self, lemma_lu_fn=config.lemma_lu_fn, infl_lu_fn=config.inflection_lu_fn):
+        self.lemma_lu_fn = lemma_lu_fn
+        self.infl_lu_fn  = infl_lu_fn
+        self.load_lock   = threading.RLock()
+
+    # Return a new dict of lemma -> {tag:(spellings,..)} for Inflections.  The entries are shared
+    # with the store so they should be replaced, not modified (see OverridesCodec.apply).
+    def getInflDict(self):
+        return dict(self._getForwardIndex())
+
+    # Return a new Mapping of word -> {upos:(lemmas,..)} for the Lemmatizer
+    def getLemmaDict(self):
+        self._getForwardIndex()
+        return LemmaIndex(self.forward, self.inverse)
+
+    # Number of entries in the inverse index stored as complete lemma_lu entries
+    def numExceptions(self):
+        self._getForwardIndex()
+        return sum(1 for ref in self.inverse.values() if ref.__class__ is dict)
+
+    # Lazy load both indexes and only do it once
+    def _getForwardIndex(self):
+        if not hasattr(self, 'forward'):
+            with self.load_lock:
+                if not hasattr(self, 'forward'):
+                    forward = InflectionLUCodec.load(self.infl_lu_fn)
+                    strings = shareStrings(forward)
+                    self.inverse = self._buildInverse(forward, strings)
+                    self.forward = forward
+        return self.forward
+
+    # Load lemma_lu and convert it to the inverse index over the forward index's strings.
+    # The file is read line by line, without loading the complete lemma dict.
+    def _buildInverse(self, forward, strings):
+        inverse = {}
+        word, entry = None, None
+        for line_word, upos, lemmas in LemmaLUCodec.iterate(self.lemma_lu_fn):
+            if line_word != word:   # the lines for each word are normally together
+                if word is not None:
+                    self._addLemmaEntry(inverse, forward, strings, word, entry)
+                word, entry = line_word, {}
+            entry[upos] = lemmas
+        if word is not None:
+            self._addLemmaEntry(inverse, forward, strings, word, entry)
+        return inverse
+
+    # Add the word's {upos:(lemmas,..)} entry to the inverse index.  It's stored as a reference to
+    # the lemmas if the entry can be re-built from their paradigms, otherwise it's stored as is.
+    @staticmethod
+    def _addLemmaEntry(inverse, forward, strings, word, entry):
+        word = strings.setdefault(word, word)
+        if word in inverse:
+            ref = inverse[word]
+            merged = ref if ref.__class__ is dict else buildLemmaEntry(forward, word, ref)
+            entry = dict(merged, **entry)
+        # Lemmas for all the upos types, in order
+        lemmas = []
+        for upos_lemmas in entry.values():
+            lemmas += [l for l in upos_lemmas if l not in lemmas]
+        if all(l in forward for l in lemmas):
+            ref = strings[lemmas[0]] if len(lemmas) == 1 else tuple(strings[l] for l in lemmas)
+            if buildLemmaEntry(forward, word, ref) == entry:
+                inverse[word] = ref
+                return
+        inverse[word] = {upos:tuple(strings.setdefault(l, l) for l in upos_lemmas) \
+                         for upos, upos_lemmas in entry.items()}
+
+
+# Replace the strings in the forward index so that each one is a single object.  Returns the dict
+# of the strings used, to share them with other data.
+def shareStrings(forward):
+    strings = {}
+    for lemma, forms in forward.items():
+        strings[lemma] = lemma
+        for tag, spellings in forms.items():
+            forms[tag] = tuple(strings.setdefault(s, s) for s in spellings)
+    return strings
+
+
+_tag_upos = {}  # cache of tagToUPos for the tags in the forward index
+
+# Re-build the lemma_lu entry, {upos:(lemmas,..)}, for the word from the paradigms of the lemmas
+# referenced in the inverse index.  ref is a single lemma or a tuple of them.
+def buildLemmaEntry(forward, word, ref):
+    entry = {}
+    for lemma in ((ref,) if ref.__class__ is str else ref):
+        for tag, spellings in forward[lemma].items():
+            if word in spellings:
+                upos = _tag_upos.get(tag)
+                if upos is None:
+                    upos = _tag_upos[tag] = tagToUPos(tag)
+                lemmas = entry.get(upos, ())
+                if lemma not in lemmas:
+                    entry[upos] = lemmas + (lemma,)
+    return entry
+
+
+# Read-only dict style access to the lemma data in the unified lexicon.  Entries are re-built
+# from the forward index on each access.  Entries assigned with [] (ie.. overrides) are held
+# in memory, on top of the shared data.
+class LemmaIndex(Mapping):
+    def __init__(self, forward, inverse):
+        self.forward = forward
+        self.inverse = inverse
+        self.overlay = {}
+
+    def __getitem__(self, word):
+        entry = self.overlay.get(word)
+        if entry is not None:
+            return entry
+        ref = self.inverse[word]
+        if ref.__class__ is dict:
+            return ref
+        return buildLemmaEntry(self.forward, word, ref)
+
+    def get(self, word, default=None):
+        try:
+            return self[word]
+        except KeyError:
+            return default
+
+    def __setitem__(self, word, entry):
+        self.overlay[word] = entry
+
+    def __contains__(self, word):
+        return word in self.overlay or word in self.inverse
+
+    def __len__(self):
+        return len(self.inverse) + sum(1 for w in self.overlay if w not in self.inverse)
+
+    def __iter__(self):
+        yield from self.inverse
+        yield from (w for w in self.overlay if w not in self.inverse)
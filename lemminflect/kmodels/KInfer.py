@@ -1,23 +1,33 @@
 from   abc import ABC, abstractmethod
-import numpy as np
+from   collections import namedtuple
 from   .KerasModel import limitTFMem
+from   .WordEncoder import keysToVecs, keysToIndexes
+from   .Quantization import loadQuantizedModel
 from   ..utils.DataContainer import DataContainer
 
+# Note that numpy is imported lazily in this module so that it's only loaded when one of the
+# neural net engines is used.  The table engine doesn't require it.
+
 
 # Factory style method for creating the KInfer object
-def getKInferInstance(kitype, model_fn):
+# precision only applies to the numpy engine (see Quantization.py)
+def getKInferInstance(kitype, model_fn, precision='float32'):
     if kitype == 'numpy':
-        return KInferWithNumpy(model_fn)
+        return KInferWithNumpy(model_fn, precision=precision)
     elif kitype == 'keras':
         return KInferWithKeras(model_fn)
+    elif kitype == 'table':
+        from .KInferTable import KInferWithTable
+        return KInferWithTable(KInferWithTable.getTableFilename(model_fn))
     else:
-        raise ValueError('Unhandled kitype = ' % kitype)
+        raise ValueError('Unhandled kitype = %s' % kitype)
 
 
 # Base class for Keras model inference
 class KInfer(ABC):
     def __init__(self):
         self.meta = None
+        self.in_shape = None    # (nsteps, nfeats) of a single input
 
     # Run the input vector through the model.
     # This returns the argmax and the enumerated output strings.
@@ -25,6 +35,17 @@ class KInfer(ABC):
     def run(self, in_vec):
         pass
 
+    # Run a batch of input vectors, shape (N, nsteps, nfeats), through the model at once.
+    # This returns an array of the argmax indexes and a list of the enumerated output strings.
+    @abstractmethod
+    def runBatch(self, X):
+        pass
+
+    # Run a list of (category, inverted suffix) keys from WordEncoder.wordToKey through the model.
+    # Returns the same as runBatch.
+    def runKeys(self, keys):
+        return self.runBatch(keysToVecs(keys, *self.in_shape))
+
     # Return the output enumeration string
     def getOutputEnum(self):
         return self.meta['output_enum']
@@ -32,15 +53,29 @@ class KInfer(ABC):
     # Load the model data from the DataContainer
     def _loadModelContainer(self, fn):
         dc = DataContainer.load(fn)
-        self.meta = dc.meta
-        return dc.config, dc.weights
+        return self._setModelData(dc.meta, dc.config, dc.weights)
+
+    # Set the model meta data and return the config and weights
+    def _setModelData(self, meta, config, weights):
+        self.meta = meta
+        self.in_shape = tuple(config['layers'][0]['config']['batch_input_shape'][1:])
+        return config, weights
 
     # Convert the network's output vector to an index and string
     def _netOutToValue(self, vec):
+        import numpy as np
         index = np.argmax(vec)
         string = self.getOutputEnum()[index]
         return index, string
 
+    # Convert the network's output matrix to an array of indexes and a list of strings
+    def _netOutToValues(self, Y):
+        import numpy as np
+        indexes = np.argmax(Y, axis=-1)
+        enum = self.getOutputEnum()
+        strings = [enum[i] for i in indexes]
+        return indexes, strings
+
 
 # Keras based inference
 class KInferWithKeras(KInfer):
@@ -49,10 +84,16 @@ class KInferWithKeras(KInfer):
         self._load(fn)
 
     def run(self, in_vec):
+        import numpy as np
         X = np.expand_dims(in_vec, 0)
         Y = self.model.predict(X, verbose=0)
         return self._netOutToValue(Y[0])
 
+    def runBatch(self, X):
+        import numpy as np
+        Y = self.model.predict(np.asarray(X), verbose=0)
+        return self._netOutToValues(Y)
+
     def _load(self, fn):
         import keras    # Lazy import keras
         if keras.backend.backend() == 'tensorflow':
@@ -63,40 +104,132 @@ class KInferWithKeras(KInfer):
 
 
 
+# A dense layer in KInferWithNumpy's execution plan.  W and b are the kernel and bias, scale is the
+# per-column scale for int8 kernels (or None) and activation is the in-place activation function,
+# or None when it isn't needed.  name and activation_name are for inspection.
+PlanStep = namedtuple('PlanStep', ['name', 'W', 'b', 'scale', 'activation', 'activation_name'])
+
+
 # Numpy based inference.
 # Note that keras supports a lot of complicated model configurations.  This class in only
 # setup to handle the very limited subset used in LemmInflect
+#
+# The Keras config is compiled once, at load, into a plan of dense layers (see getPlan) so the
+# calls don't need to interpret it.  The input is flattened when it's passed in, the weights are
+# contiguous float32 (unless a reduced precision is used) and the softmax on the output layer is
+# dropped since the argmax of the logits is the same.
 class KInferWithNumpy(KInfer):
-    def __init__(self, fn):
+    # model_data is an optional tuple of (meta, config, weights) or (meta, config, weights, scales)
+    # to use instead of loading fn.  This allows the weights to be arrays backed by shared memory.
+    # precision is float32, float16 or int8.  For the latter two, the model's kernels are
+    # converted, or loaded from the converted file if it exists (see Quantization.py).  When
+    # model_data is given, its weights and scales must already be at the precision.
+    def __init__(self, fn=None, model_data=None, precision='float32'):
         super(KInferWithNumpy, self).__init__()
-        self.config, self.weights = self._loadModelContainer(fn)
+        self.precision = precision
+        if model_data is None and precision != 'float32':
+            model_data = loadQuantizedModel(fn, precision)
+        if model_data is not None:
+            meta, config, weights = model_data[:3]
+            scales = model_data[3] if len(model_data) > 3 else None    # per-column int8 scales
+            if precision == 'int8' and scales is None:
+                raise ValueError('The scales are required for int8 weights')
+            self.config, weights = self._setModelData(meta, config, weights)
+        else:
+            self.config, weights = self._loadModelContainer(fn)
+            scales = None
+        self.plan = self._compilePlan(weights, scales or [None]*len(weights))
+        self.in_size = self.in_shape[0] * self.in_shape[1]
+        # The weights and scales in the same order as the model's weight list
+        self.weights = [w for step in self.plan for w in (step.W, step.b)]
+        self.scales  = [s for step in self.plan for s in (step.scale, None)]
+
+    # Return the list of PlanStep for the compiled model
+    def getPlan(self):
+        return list(self.plan)
 
     def run(self, in_vec):
+        import numpy as np
+        indexes, strings = self.runBatch(np.expand_dims(in_vec, 0))
+        return indexes[0], strings[0]
+
+    def runBatch(self, X):
+        import numpy as np
+        X = np.asarray(X, dtype='float32')
+        if X.shape[1:] != self.in_shape:
+            raise ValueError('Invalid input shape %s, expected (N, %d, %d)' % \
+                ((str(X.shape),) + self.in_shape))
+        return self._netOutToValues(self._runPlan(X.reshape(X.shape[0], self.in_size), 0))
+
+    # Run the keys through the model without building the one-hot vectors.  The first dense
+    # layer's output is the sum of the weight rows for the active inputs plus the bias.
+    # Padding (short suffixes) is indexed as row 0 and masked out by the sum, which is done as a
+    # matmul of the mask with the gathered rows.  This way the kernel is used as is (ie.. it can
+    # stay in shared memory) instead of needing a copy with a zero row added for the padding.
+    def runKeys(self, keys):
+        import numpy as np
+        W = self.plan[0].W
+        pad_idx = W.shape[0]
+        idxs = keysToIndexes(keys, self.in_shape[0], self.in_shape[1], pad_idx)
+        valid = idxs != pad_idx
+        rows = W[idxs * valid].astype('float32', copy=False)
+        x = np.matmul(valid[:, None, :].astype('float32'), rows)[:, 0]
+        return self._netOutToValues(self._finishStep(x, self.plan[0], 1))
+
+    # Run x, shape (N, nfeatures), through the plan starting at step snum
+    def _runPlan(self, x, snum):
+        return self._finishStep(dotKernel(x, self.plan[snum].W), self.plan[snum], snum+1)
+
+    # Apply the scale, bias and activation for the step to x, the product of the input and the
+    # step's kernel, then run the rest of the plan starting at step snum
+    def _finishStep(self, x, step, snum):
+        while True:
+            if step.scale is not None:
+                x *= step.scale
+            x += step.b
+            if step.activation is not None:
+                x = step.activation(x)
+            if snum >= len(self.plan):
+                return x
+            step = self.plan[snum]
+            snum += 1
+            x = dotKernel(x, step.W)
+
+    # Compile the model config into the list of PlanStep.  This is where the model structure
+    # is checked, instead of on every call.
+    def _compilePlan(self, weights, scales):
+        import numpy as np
         layers = self.config['layers']
-        # input layer
-        assert layers[0]['class_name'] == 'InputLayer'
-        in_shape = layers[0]['config']['batch_input_shape'] # (None, nsteps, nfeats)
-        assert in_shape[1] == in_vec.shape[0]
-        assert in_shape[2] == in_vec.shape[1]
-        x = in_vec
-        # Remaining dense or flatten layers
-        wnum = 0
-        for layer in layers[1:]:
-            ltype = layer['class_name']
-            if ltype == 'Flatten':
-                x = flatten(x)
-            elif ltype == 'Dense':
-                W = self.weights[wnum]
-                b = self.weights[wnum+1]
-                wnum += 2
-                x = np.dot(x, W) + b
-                x = applyActivation(x, layer['config']['activation'])
-        return self._netOutToValue(x)
+        if layers[0]['class_name'] != 'InputLayer' or layers[1]['class_name'] != 'Flatten':
+            raise ValueError('Unhandled model structure.  Expected the input to be flattened.')
+        plan, wnum = [], 0
+        for layer in layers[2:]:
+            if layer['class_name'] != 'Dense':
+                raise ValueError('Unhandled layer type = %s' % layer['class_name'])
+            W, b = weights[wnum], weights[wnum+1]
+            if self.precision == 'float32':
+                W = np.ascontiguousarray(W, dtype='float32')
+            else:
+                W = np.ascontiguousarray(W)
+            b = np.ascontiguousarray(b, dtype='float32')
+            aname = layer['config']['activation']
+            if aname not in ACTIVATIONS:
+                raise ValueError('Unhandled activation type = %s' % aname)
+            plan.append(PlanStep(layer['config']['name'], W, b, scales[wnum], ACTIVATIONS[aname],
+                                 aname))
+            wnum += 2
+        if not plan:
+            raise ValueError('Model has no dense layers')
+        # Only the argmax of the output is used so the softmax isn't needed
+        if plan[-1].activation_name == 'softmax':
+            plan[-1] = plan[-1]._replace(activation=None, activation_name='linear')
+        return plan
 
     def _printModelData(self):
-        print('Weights:')
-        for weight in self.weights:
-            print('  ', weight.shape)
+        print('Plan:')
+        for step in self.plan:
+            print('   %-8s %-10s %-8s %s' % (step.name, 'x'.join(str(d) for d in step.W.shape),
+                step.W.dtype, step.activation_name))
         print('Config:')
         for k, v in self.config.items():
             if k == 'layers':
@@ -107,20 +240,31 @@ class KInferWithNumpy(KInfer):
 
 
 ### Misc functions used in computing the net ###
-def flatten(x):
-    return np.reshape(x, (-1,))
-
-def relu(x):
-    return x * (x > 0)
+# All of these operate on a batch, where the first dimension is the sample number
+def reluInPlace(x):
+    import numpy as np
+    return np.maximum(x, 0, out=x)
 
 def softmax(x, axis=-1):
+    import numpy as np
     y = np.exp(x - np.max(x, axis, keepdims=True))
     return y / np.sum(y, axis, keepdims=True)
 
-def applyActivation(x, atype):
-    if atype == 'relu':
-        return relu(x)
-    elif atype == 'softmax':
-        return softmax(x)
-    else:
-        raise ValueError('Unhandled activation type = %s' % atype)
+# Return x (float32) times the kernel W.  numpy converts a float16 or int8 kernel to a float32
+# copy for the product, so these are converted a block of rows at a time, limiting the temporary
+# copy to about KERNEL_BLOCK_SIZE values instead of the whole kernel.  Keeping a float32 copy of
+# the kernels would save the conversion on each call but would undo the memory savings.  The
+# LemmInflect kernels fit in a single block.
+KERNEL_BLOCK_SIZE = 16384
+def dotKernel(x, W):
+    import numpy as np
+    if W.dtype == np.float32:
+        return np.dot(x, W)
+    nrows = max(1, KERNEL_BLOCK_SIZE // max(1, W.shape[1]))
+    y = np.dot(x[:, :nrows], W[:nrows].astype('float32'))
+    for r in range(nrows, W.shape[0], nrows):
+        y += np.dot(x[:, r:r+nrows], W[r:r+nrows].astype('float32'))
+    return y
+
+# Activation functions used by KInferWithNumpy's plan, by their Keras name
+ACTIVATIONS = {'relu':reluInPlace, 'softmax':softmax, 'linear':None}
@@ -0,0 +1,113 @@
+from   collections import Counter
+from   .KInfer import KInfer
+from   .WordEncoder import CATEGORY_IDX
+from   ..utils.DataContainer import DataContainer
+
+
+# Inference using a suffix table distilled from one of the neural net models.
+# The models only see the category and the last few letters of a word (see WordEncoder.wordToKey)
+# so the table is a trie, for each category, on the inverted suffix.  Each node holds the model
+# output for the words in the distillation corpus that end in that suffix.  Words that aren't in
+# the corpus get the output of the longest matching suffix.
+# This is pure python and doesn't require numpy.  The tables are built by
+# scripts/03_BuildLITypeModels/30_BuildSuffixTables.py
+#
+# Table format: {category:node} where a node is either an output index (a leaf) or a tuple of
+# (output index, {letter:node}).  Keys shorter than the model's letter count are terminated
+# with END so that short words are distinguished from longer words with the same ending.
+class KInferWithTable(KInfer):
+    END = '$'
+
+    # If fn is None, the tables need to be supplied with setTables()
+    def __init__(self, fn=None):
+        super(KInferWithTable, self).__init__()
+        self.categories = {i:c for c, i in CATEGORY_IDX.items()}
+        if fn is not None:
+            dc = DataContainer.load(fn)
+            self.setTables(dc.meta, dc.tables)
+
+    def setTables(self, meta, tables):
+        self.meta     = meta
+        self.tables   = tables
+        self.nletters = meta['nletters']
+
+    def run(self, in_vec):
+        indexes, strings = self.runKeys([self._vecToKey(in_vec)])
+        return indexes[0], strings[0]
+
+    def runBatch(self, X):
+        return self.runKeys([self._vecToKey(in_vec) for in_vec in X])
+
+    # Look up a list of (category, inverted suffix) keys from WordEncoder.wordToKey.
+    # Returns a list of the output indexes and a list of the output strings.
+    def runKeys(self, keys):
+        enum = self.getOutputEnum()
+        indexes = [self.lookup(category, suffix) for category, suffix in keys]
+        return indexes, [enum[i] for i in indexes]
+
+    # Walk the trie for the category as far as the suffix matches and return the output index
+    def lookup(self, category, suffix):
+        node = self.tables.get(category)
+        if node is None:
+            raise ValueError('Unhandled category: %s' % category)
+        if len(suffix) < self.nletters:
+            suffix += self.END
+        for letter in suffix:
+            if node.__class__ is int:
+                return node
+            child = node[1].get(letter)
+            if child is None:
+                return node[0]
+            node = child
+        return node if node.__class__ is int else node[0]
+
+    # Name of the table file that corresponds to the neural net model file
+    @staticmethod
+    def getTableFilename(model_fn):
+        if model_fn.endswith('.pkl.gz'):
+            return model_fn[:-len('.pkl.gz')] + '_table.pkl.gz'
+        return model_fn + '_table'
+
+    # Convert a one-hot input vector back to its (category, inverted suffix) key.
+    # This is only used for compatibility with run/runBatch.  runKeys is much faster.
+    def _vecToKey(self, in_vec):
+        category = self.categories[_hotIndex(in_vec[0])]
+        letters = []
+        for row in in_vec[1:]:
+            idx = _hotIndex(row)
+            if idx is None:
+                break
+            letters.append('#' if idx == 1 else chr(idx+95))
+        return category, ''.join(letters)
+
+
+# Index of the 1 in a one-hot row, or None if the row is empty
+def _hotIndex(row):
+    for i, val in enumerate(row):
+        if val:
+            return i
+    return None
+
+
+# Build the tables from a list of keys and the model's output index for each of them.
+# Each node is assigned the most common output of the keys below it and children that would
+# return the same value as their parent are pruned, so every key in the list still gets its
+# exact output back.
+def buildSuffixTables(keys, outputs, nletters):
+    roots = {}
+    for (category, suffix), output in zip(keys, outputs):
+        if len(suffix) < nletters:
+            suffix += KInferWithTable.END
+        node = roots.setdefault(category, (Counter(), {}))
+        node[0][output] += 1
+        for letter in suffix:
+            node = node[1].setdefault(letter, (Counter(), {}))
+            node[0][output] += 1
+    return {category:_compactNode(node) for category, node in roots.items()}
+
+def _compactNode(node):
+    counts, children = node
+    value = min(counts, key=lambda v:(-counts[v], v))   # ties go to the lowest output index
+    children = {letter:_compactNode(child) for letter, child in children.items()}
+    children = {letter:child for letter, child in children.items() if child != value}
+    return (value, children) if children else value
@@ -1,4 +1,3 @@
-import  numpy
 from    ..utils.DataContainer import DataContainer
 
 
@@ -53,6 +52,7 @@ class KerasModel(object):
     # Model takes in multiple list of vectors  (ie. 3D matrix = sample#, word#, wordvec)
     # Returns an output vector for each sample (ie. 2D matrix = sample#, outvec)
     def run(self, inputMat3D):
+        import numpy    # Lazy import numpy
         X = numpy.asarray( inputMat3D )
         Y = self.model.predict(X, verbose=0)
         return Y
@@ -1,6 +1,6 @@
-import numpy
 from   ..codecs.InflTCorpFileCodec import InflTCorpFileCodec
 from   ..slexicon.SKey import *
+from   .WordEncoder import wordsToVecs, wordToKey, CATEGORY_IDX
 
 
 class ModelInflInData(object):
@@ -13,6 +13,7 @@ class ModelInflInData(object):
     # Empty characters are labeled 0, characters not a-z are labeled 1
     @classmethod
     def wordToVec(cls, word, category):
+        import numpy    # Lazy import numpy
         vec = numpy.zeros(shape=(cls.WVEC_LEN, cls.MAX_LETTER_IDX), dtype='float32')
         word = list(word.lower())[::-1]     # lower-case, list, inverted-order
         for i, letter in enumerate(word):
@@ -34,6 +35,23 @@ class ModelInflInData(object):
             raise ValueError('Unhandled category: %s' % category)
         return vec
 
+    # Encode a list of words and categories into a single (N, WVEC_LEN, MAX_LETTER_IDX) array.
+    # Pass in a previously returned array as out to re-use it.
+    @classmethod
+    def wordsToVecs(cls, words, categories, out=None):
+        return wordsToVecs(words, categories, cls.WVEC_LEN, cls.MAX_LETTER_IDX, out)
+
+    # Hashable key for the part of the word the model sees.  Words with the same key
+    # get the same model output.
+    @classmethod
+    def wordToKey(cls, word, category):
+        return wordToKey(word, category, cls.WVEC_LEN)
+
+    # True if the category can be encoded for the model
+    @staticmethod
+    def isValidCategory(category):
+        return category in CATEGORY_IDX
+
     # Input letters classes
     @staticmethod
     def getLetterClasses():
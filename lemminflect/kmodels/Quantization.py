@@ -0,0 +1,59 @@
+import os
+from   ..utils.DataContainer import DataContainer
+
+# Reduced precision versions of the model weights for KInferWithNumpy.
+#   float16 : kernels are stored as float16
+#   int8    : kernels are stored as int8 with a float32 scale for each output column
+#             (symmetric quantization, W ~= q * scale)
+# Biases are always kept as float32.  The numpy engine multiplies by the float16 / int8 kernels
+# directly and applies the scale to the layer's output.
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+# Convert the list of weights to the precision.  Returns a list of the new weights and a list
+# of the per-column scales (None for weights that don't have one).
+def quantizeWeights(weights, precision):
+    import numpy    # Lazy import numpy
+    if precision not in PRECISIONS:
+        raise ValueError('Unhandled precision = %s' % precision)
+    qweights, scales = [], []
+    for w in weights:
+        w = numpy.asarray(w, dtype='float32')
+        scale = None
+        if w.ndim == 2 and precision == 'float16':
+            w = w.astype('float16')
+        elif w.ndim == 2 and precision == 'int8':
+            scale = numpy.abs(w).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            w = numpy.clip(numpy.round(w / scale), -127, 127).astype('int8')
+            scale = scale.astype('float32')
+        qweights.append(w)
+        scales.append(scale)
+    return qweights, scales
+
+# Name of the converted file for the model file
+def getQuantizedFilename(model_fn, precision):
+    if model_fn.endswith('.pkl.gz'):
+        return model_fn[:-len('.pkl.gz')] + '_%s.pkl.gz' % precision
+    return model_fn + '_' + precision
+
+# Convert a saved model to the precision and save it.  Returns the new filename.
+def saveQuantizedModel(model_fn, precision):
+    dc = DataContainer.load(model_fn)
+    dc.weights, dc.scales = quantizeWeights(dc.weights, precision)
+    dc.meta = dict(dc.meta, precision=precision)
+    out_fn = getQuantizedFilename(model_fn, precision)
+    dc.save(out_fn)
+    return out_fn
+
+# Load the model data at the precision.  Use the converted file if it's been created,
+# otherwise convert the weights at load time.
+# Returns meta, config, weights, scales
+def loadQuantizedModel(model_fn, precision):
+    q_fn = getQuantizedFilename(model_fn, precision)
+    if precision != 'float32' and os.path.exists(q_fn):
+        dc = DataContainer.load(q_fn)
+        return dc.meta, dc.config, dc.weights, dc.scales
+    dc = DataContainer.load(model_fn)
+    weights, scales = quantizeWeights(dc.weights, precision)
+    return dc.meta, dc.config, weights, scales
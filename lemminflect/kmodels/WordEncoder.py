@@ -0,0 +1,91 @@
+import re
+from   ..slexicon.SKey import *
+
+
+# Index of the category one-hot, in the first row of the word vector
+CATEGORY_IDX = {SKey.NOUN:0, SKey.VERB:1, SKey.ADJ:2, SKey.ADV:3}
+
+_NON_LETTER_RE = re.compile(r'[^a-z]')
+_LETTER_IDX = {chr(i):i-95 for i in range(97, 123)}     # a-z are 2-27 in the one-hot vector
+
+
+# The models only see the category and the last (wvec_len-1) letters of the word, lower-cased
+# and folded to a-z or <oov>.  This returns that information as a hashable key, so every word
+# with the same key gets the same output from the model. The key's string is the inverted
+# suffix with any <oov> letters replaced by '#'.
+def wordToKey(word, category, wvec_len=9):
+    return (category, _NON_LETTER_RE.sub('#', word.lower()[::-1][:wvec_len-1]))
+
+
+# Vectorized version of ModelLemmaInData.wordToVec / ModelInflInData.wordToVec for a list
+# of words.  The one-hot vectors are filled into a single (N, wvec_len, max_letter_idx) array.
+# If out is supplied and has at least N rows, it is zeroed and re-used instead of allocating
+# a new array.  The returned array is out[:N] in this case.
+# Raises a ValueError if any of the categories are not handled by the models.
+def wordsToVecs(words, categories, wvec_len, max_letter_idx, out=None):
+    import numpy    # Lazy import numpy so it's not required with the table inference engine
+    nwords = len(words)
+    if len(categories) != nwords:
+        raise ValueError('Length of words (%d) and categories (%d) differ' % \
+            (nwords, len(categories)))
+    if out is None or out.shape[0] < nwords:
+        out = numpy.zeros(shape=(nwords, wvec_len, max_letter_idx), dtype='float32')
+    else:
+        out = out[:nwords]
+        out.fill(0)
+    # Category one-hot goes in the first row
+    try:
+        cat_idxs = [CATEGORY_IDX[c] for c in categories]
+    except KeyError as e:
+        raise ValueError('Unhandled category: %s' % e.args[0])
+    rows = numpy.arange(nwords)
+    out[rows, 0, cat_idxs] = 1
+    # Lower-case, invert and truncate the words, then use the fixed width unicode array
+    # as an (N, nletters) array of code points. Empty letter positions are 0.
+    nletters = wvec_len - 1
+    chars = numpy.array([w.lower()[::-1][:nletters] for w in words], dtype='<U%d' % nletters)
+    cps = chars.view(numpy.uint32).reshape(nwords, nletters)
+    # Letters a-z are 2-27, all others are <oov>=1.  Empty positions are left as all zeros.
+    one_hot = numpy.where((cps >= 97) & (cps <= 122), cps - 95, 1)
+    rows, cols = numpy.nonzero(cps)
+    out[rows, cols+1, one_hot[rows, cols]] = 1
+    return out
+
+
+# Encode a list of keys from wordToKey.  Since the key is the inverted suffix, re-inverting it
+# gives a word that encodes to the same vector.
+def keysToVecs(keys, wvec_len, max_letter_idx, out=None):
+    return wordsToVecs([k[1][::-1] for k in keys], [k[0] for k in keys], wvec_len, \
+        max_letter_idx, out)
+
+
+# Indexes of the 1s in the flattened (wvec_len*max_letter_idx) word vectors for a list of keys
+# from wordToKey.  Since the vectors are one-hot, the first dense layer of the model can be
+# computed by summing the weight rows at these indexes instead of building the vectors.
+# Returns an (N, wvec_len) int array.  Empty letter positions are set to pad_idx.
+def keysToIndexes(keys, wvec_len, max_letter_idx, pad_idx):
+    import numpy    # Lazy import numpy
+    nkeys = len(keys)
+    nletters = wvec_len - 1
+    try:
+        cat_idxs = [CATEGORY_IDX[k[0]] for k in keys]
+    except KeyError as e:
+        raise ValueError('Unhandled category: %s' % e.args[0])
+    # For a few keys, building the lists in python is faster than the array operations below
+    if nkeys <= 16:
+        rows = []
+        for cat_idx, (_, suffix) in zip(cat_idxs, keys):
+            row = [cat_idx] + [max_letter_idx*i + _LETTER_IDX.get(c, 1) \
+                               for i, c in enumerate(suffix, 1)]
+            row += [pad_idx]*(wvec_len - len(row))
+            rows.append(row)
+        return numpy.array(rows, dtype=numpy.intp).reshape(nkeys, wvec_len)
+    idxs = numpy.empty(shape=(nkeys, wvec_len), dtype=numpy.intp)
+    idxs[:, 0] = cat_idxs
+    # Suffixes are already lower-cased and inverted, with non a-z letters replaced by '#'
+    chars = numpy.array([k[1] for k in keys], dtype='<U%d' % nletters)
+    cps = chars.view(numpy.uint32).reshape(nkeys, nletters)
+    one_hot = numpy.where((cps >= 97) & (cps <= 122), cps - 95, 1)
+    offsets = numpy.arange(1, wvec_len) * max_letter_idx
+    idxs[:, 1:] = numpy.where(cps > 0, offsets + one_hot, pad_idx)
+    return idxs
@@ -0,0 +1,227 @@
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import threading
+from   urllib.parse import urlsplit, parse_qs
+from   http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from   .core.Lemmatizer  import Lemmatizer
+from   .core.Inflections import Inflections
+from   .aio import AsyncLemmInflect
+from   . import __version__, cacheInfo
+
+# HTTP/JSON server
+#   python -m lemminflect.serve --port 8000
+# Endpoints take the arguments as query parameters (GET) or as a JSON object (POST).  Results
+# are returned as {"result": ...} and errors as {"error": "..."} with a 4xx status.
+#   /getAllLemmas       word, upos (optional)               -> {upos:[lemmas,..]}
+#   /getLemma           word, upos, lemmatize_oov=true      -> [lemmas,..]
+#   /getAllInflections  lemma, upos (optional)              -> {tag:[inflections,..]}
+#   /getInflection      lemma, tag, inflect_oov=true        -> [inflections,..]
+#   /getLemmas          words, upos, lemmatize_oov=true     -> [[lemmas,..],..]
+#   /getInflections     lemmas, tags, inflect_oov=true      -> [[inflections,..],..]
+#   /stats              request counts, latencies, batches and cache hit rates
+# The bulk endpoints take JSON arrays (or comma separated lists in a GET).  getLemma and
+# getInflection calls from concurrent requests are batched (see lemminflect.aio) so the
+# OOV model is run once for all of them.
+DEFAULT_PORT = 8000
+
+
+# Request handling
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'lemminflect/' + __version__
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        args = {k:v[-1] for k, v in parse_qs(url.query).items()}
+        self._handle(url.path, args)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            args = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(args, dict):
+                raise ValueError('The request body must be a JSON object')
+        except ValueError as e:
+            self._send(400, {'error':'Invalid request body: %s' % e})
+            return
+        self._handle(url.path, args)
+
+    def _handle(self, path, args):
+        st = time.perf_counter()
+        endpoint = self.server.endpoints.get(path)
+        if endpoint is None:
+            self._send(404, {'error':'Unknown endpoint %s' % path})
+            return
+        try:
+            status, body = 200, {'result':endpoint(args)}
+        except KeyError as e:
+            status, body = 400, {'error':'Missing argument %s' % e}
+        except (TypeError, ValueError) as e:
+            status, body = 400, {'error':str(e)}
+        except Exception as e:
+            self.server.logger.exception('Error handling %s', path)
+            status, body = 500, {'error':str(e)}
+        self._send(status, body)
+        self.server.stats.record(path, time.perf_counter() - st, status != 200)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        self.server.logger.debug(format, *args)
+
+
+# Request counts, errors and latencies for each endpoint.  Thread-safe.
+class ServerStats(object):
+    def __init__(self):
+        self.lock      = threading.Lock()
+        self.start     = time.time()
+        self.endpoints = {}     # path -> [count, errors, total_secs, max_secs]
+
+    def record(self, path, secs, error):
+        with self.lock:
+            stats = self.endpoints.setdefault(path, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += int(error)
+            stats[2] += secs
+            stats[3]  = max(stats[3], secs)
+
+    def snapshot(self):
+        with self.lock:
+            return {'uptime_secs':time.time() - self.start,
+                    'requests':{path:{'count':count, 'errors':errors,
+                                      'mean_ms':1000*total/count, 'max_ms':1000*max_secs}
+                                for path, (count, errors, total, max_secs) in self.endpoints.items()}}
+
+
+# The server.  The getLemma and getInflection calls are run through an AsyncLemmInflect on an
+# event loop in a separate thread, so calls from concurrent requests are batched together.
+class LemmInflectServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, batch_window=None, max_batch_size=None):
+        super().__init__(address, RequestHandler)
+        self.logger = logging.getLogger(__name__)
+        self.stats  = ServerStats()
+        self.api    = AsyncLemmInflect(batch_window, max_batch_size)
+        self.loop   = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever,
+                                            name='lemminflect-serve-loop', daemon=True)
+        self.loop_thread.start()
+        self.endpoints = {'/getAllLemmas'      : self.getAllLemmas,
+                          '/getLemma'          : self.getLemma,
+                          '/getAllInflections' : self.getAllInflections,
+                          '/getInflection'     : self.getInflection,
+                          '/getLemmas'         : self.getLemmas,
+                          '/getInflections'    : self.getInflections,
+                          '/stats'             : self.getStats}
+
+    def server_close(self):
+        super().server_close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.loop.close()
+
+    def getAllLemmas(self, args):
+        return dict(Lemmatizer().getAllLemmas(getStr(args, 'word'), getStr(args, 'upos', None)))
+
+    def getAllInflections(self, args):
+        return dict(Inflections().getAllInflections(getStr(args, 'lemma'),
+                                                    getStr(args, 'upos', None)))
+
+    def getLemma(self, args):
+        return self._run(self.api.getLemma(getStr(args, 'word'), getStr(args, 'upos'),
+                                           getBool(args, 'lemmatize_oov')))
+
+    def getInflection(self, args):
+        return self._run(self.api.getInflection(getStr(args, 'lemma'), getStr(args, 'tag'),
+                                                getBool(args, 'inflect_oov')))
+
+    def getLemmas(self, args):
+        return self._run(self.api.getLemmas(getList(args, 'words'), getList(args, 'upos'),
+                                            getBool(args, 'lemmatize_oov')))
+
+    def getInflections(self, args):
+        return self._run(self.api.getInflections(getList(args, 'lemmas'), getList(args, 'tags'),
+                                                 getBool(args, 'inflect_oov')))
+
+    def getStats(self, args):
+        stats = self.stats.snapshot()
+        stats['batches'] = self.api.numBatches(self.loop)
+        stats['caches']  = {name:None if info is None else {'hits':info.hits,
+                                'misses':info.misses, 'currsize':info.currsize,
+                                'hit_rate':info.hits / max(1, info.hits + info.misses)}
+                            for name, info in cacheInfo().items()}
+        return stats
+
+    # Run the coroutine on the event loop and wait for its result
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+# Argument conversion for values that come from either a query string or JSON.  Values of the
+# wrong type raise TypeError, so the request gets a 400 instead of failing in the lookups.
+def getBool(args, name, default=True):
+    value = args.get(name, default)
+    if isinstance(value, str):
+        if value.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError('Invalid value for %s = %s' % (name, value))
+        return value.lower() in ('true', '1')
+    return bool(value)
+
+# default is returned when the argument is missing or null.  Without it, the argument is required.
+_REQUIRED = object()
+def getStr(args, name, default=_REQUIRED):
+    if default is not _REQUIRED and args.get(name) is None:
+        return default
+    value = args[name]
+    if not isinstance(value, str):
+        raise TypeError('%s must be a string' % name)
+    return value
+
+def getList(args, name):
+    value = args[name]
+    if isinstance(value, str):
+        return value.split(',') if value else []
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise TypeError('%s must be a list of strings' % name)
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m lemminflect.serve',
+                                     description='LemmInflect HTTP/JSON server')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--batch-window', type=float, help='Seconds to collect calls into a batch')
+    parser.add_argument('--max-batch-size', type=int, help='Maximum number of words in a batch')
+    parser.add_argument('--no-preload', action='store_true',
+                        help="Don't load the data before starting")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s %(name)s] %(message)s')
+    if not args.no_preload:
+        from .core.Preload import preload
+        preload()
+    server = LemmInflectServer((args.host, args.port), args.batch_window, args.max_batch_size)
+    server.logger.info('Serving on http://%s:%d', *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import logging
+import spacy
+from   .core.Lemmatizer  import Lemmatizer
+from   .core.Inflections import Inflections
+from   .core.SpacyComponents import registerSpacyFactories, createLemmatizerComponent
+
+# spaCy integration
+# Importing this module registers the Token._.lemma() and Token._.inflect() extensions and the
+# pipeline component factories with spaCy.  lemminflect does this automatically when spaCy has
+# already been imported, otherwise import this or call register() explicitly.  This keeps
+# `import lemminflect` from importing spaCy.  The component factories are also available through
+# the spacy_factories entry point, so nlp.add_pipe('lemminflect_lemmatizer') works without it.
+MIN_VERSION = '2.0'
+_registered = False
+
+
+# Register the extensions and factories with spaCy.  Calling this more than once has no effect.
+# Returns False if the spaCy version is too old to support them.
+def register():
+    global _registered
+    if _registered:
+        return True
+    mv = [int(v) for v in MIN_VERSION.split('.')[:2]]
+    sv = [int(v) for v in spacy.__version__.split('.')[:2]]
+    if sv < mv:
+        logging.warning('Spacy extensions are disabled.  Spacy version is %s.  '
+                        'A minimum of %s is required', spacy.__version__, MIN_VERSION)
+        return False
+    spacy.tokens.Token.set_extension('lemma',   method=_spacyGetLemma)
+    spacy.tokens.Token.set_extension('inflect', method=_spacyGetInfl)
+    registerSpacyFactories(spacy)
+    _registered = True
+    return True
+
+# Extension methods.  These only get the singletons when they're called.
+def _spacyGetLemma(token, form_num=0, lemmatize_oov=True, on_empty_ret_word=True):
+    return Lemmatizer().spacyGetLemma(token, form_num, lemmatize_oov, on_empty_ret_word)
+
+def _spacyGetInfl(token, tag, form_num=0, inflect_oov=True, on_empty_ret_word=True):
+    return Inflections().spacyGetInfl(token, tag, form_num, inflect_oov, on_empty_ret_word)
+
+
+register()
@@ -0,0 +1,41 @@
+import sys
+
+
+# Used when loading the lookup tables (word -> {tag:(spellings,..)}) so that equal strings,
+# spelling tuples and word entries are single, shared objects.  The loaded tables hold many
+# duplicates, such as the (word,) tuples created for each base form and the same lemma entries for
+# all the inflections of a word.  The codecs pass each new object through here as it's parsed, so
+# the duplicates are never held.  The entries are shared so they must be replaced, not modified
+# (see OverridesCodec.apply).
+# bytes_saved is an estimate, from the sys.getsizeof total of the duplicates that were dropped.
+# Objects are held in a local table, instead of using sys.intern, so that it's released after
+# loading.  The interpreter's string table would cost about as much memory as it saves.
+class LookupInterner(object):
+    def __init__(self):
+        self.shared      = {}   # strings, spelling tuples and entry keys (tag, spellings, tag, ..)
+        self.bytes_saved = 0
+
+    def internString(self, string):
+        shared = self.shared.setdefault(string, string)
+        if shared is not string:
+            self.bytes_saved += sys.getsizeof(string)
+        return shared
+
+    # Return the shared tuple of shared strings
+    def internSpellings(self, spellings):
+        new = tuple(self.internString(s) for s in spellings)
+        shared = self.shared.setdefault(new, new)
+        if shared is not new:
+            self.bytes_saved += sys.getsizeof(spellings)
+        return shared
+
+    # Return the shared version of the {tag:spellings} entry.  The tags and spellings need to
+    # have come from internString and internSpellings.
+    def internEntry(self, entry):
+        key = sum(entry.items(), ())
+        shared = self.shared.get(key)
+        if shared is None:
+            shared = self.shared[key] = entry
+        else:
+            self.bytes_saved += sys.getsizeof(entry)
+        return shared
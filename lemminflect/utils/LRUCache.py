@@ -0,0 +1,60 @@
+import threading
+from   collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+# Simple bounded least-recently-used cache with hit/miss counters (similar to
+# functools.lru_cache but the cache can be resized, cleared and shared between methods).
+# A maxsize of 0 disables the cache.  None can not be stored as a value since it's
+# used to indicate a miss.
+class LRUCache(object):
+    def __init__(self, maxsize=1024):
+        self.data    = OrderedDict()
+        self.lock    = threading.Lock()
+        self.maxsize = max(int(maxsize), 0)
+        self.hits    = 0
+        self.misses  = 0
+
+    # Return the value for the key or None if it's not in the cache
+    def get(self, key):
+        if not self.maxsize:
+            return None
+        with self.lock:
+            value = self.data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    # Add the value to the cache, evicting the least recently used entry if full
+    def put(self, key, value):
+        if not self.maxsize:
+            return
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    # Change the maximum number of entries.  Excess entries are evicted.
+    def setMaxSize(self, maxsize):
+        with self.lock:
+            self.maxsize = max(int(maxsize), 0)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    # Remove all entries and reset the counters
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def cacheInfo(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.data))
+
+    def __len__(self):
+        return len(self.data)
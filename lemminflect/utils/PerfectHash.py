@@ -0,0 +1,61 @@
+from   array import array
+from   zlib  import crc32, adler32
+
+
+# Minimal perfect hash for a static set of keys (bytes), using hash and displace.
+# Each of the n keys maps to a unique slot in 0..n-1 so a lookup is a hash, a read of the key's
+# displacement and a compare with the key stored at the slot.
+#   bucket = crc32(key) % n
+#   d = disp[bucket]
+#   slot = -d-1                                    if d < 0  (buckets with a single key)
+#   slot = (crc32(key) + d*adler32(key)) % n       otherwise
+# The hashes are from zlib so they're the same in every process, unlike python's hash().
+# See "Hash, displace, and compress" (Belazzougui, Botelho and Dietzfelbinger)
+MAX_DISP = 1 << 20
+
+
+# Build the displacement array (int32) and the list of the key index at each slot
+def buildPerfectHash(keys):
+    n = len(keys)
+    hashes  = [(crc32(k), adler32(k)) for k in keys]
+    buckets = [[] for _ in range(n)]
+    for i, (h1, _) in enumerate(hashes):
+        buckets[h1 % n].append(i)
+    disp  = array('i', [0]) * n
+    slots = [None] * n
+    # Place the largest buckets first, while there are the most free slots
+    order = sorted(range(n), key=lambda b:len(buckets[b]), reverse=True)
+    bnum = 0
+    for bnum, b in enumerate(order):
+        bucket = buckets[b]
+        if len(bucket) <= 1:
+            break
+        for d in range(1, MAX_DISP):
+            bslots = [((hashes[i][0] + d*hashes[i][1]) & 0xffffffff) % n for i in bucket]
+            if len(set(bslots)) == len(bslots) and all(slots[s] is None for s in bslots):
+                break
+        else:
+            raise ValueError('Unable to build the perfect hash.  Duplicate keys?')
+        disp[b] = d
+        for i, s in zip(bucket, bslots):
+            slots[s] = i
+    # Buckets with a single key go directly into the remaining free slots
+    free = [s for s in range(n) if slots[s] is None]
+    for b in order[bnum:]:
+        bucket = buckets[b]
+        if not bucket:
+            break
+        s = free.pop()
+        disp[b] = -s - 1
+        slots[s] = bucket[0]
+    return disp, slots
+
+# Return the slot for the key.  disp can be an array or a memoryview cast to 'i'.
+# If the key isn't one of the ones the hash was built for, this returns some other key's slot.
+def perfectHashSlot(key, disp):
+    n = len(disp)
+    h1 = crc32(key)
+    d = disp[h1 % n]
+    if d < 0:
+        return -d - 1
+    return ((h1 + d*adler32(key)) & 0xffffffff) % n
@@ -1,11 +1,17 @@
 # See https://stackoverflow.com/questions/6760685/creating-a-singleton-in-python
 # This version should be compatible with both Python 2 and 3
 
+# The lock is re-entrant since one singleton's __init__ may create another.
+import threading
+
 class _Singleton(type):
     _instances = {}
+    _lock = threading.RLock()
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
-            cls._instances[cls] = super(_Singleton, cls).__call__(*args, **kwargs)
+            with _Singleton._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super(_Singleton, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
 
 class Singleton(_Singleton('SingletonMeta', (object,), {})):
@@ -0,0 +1,24 @@
+import threading
+from   collections import Counter
+
+
+# Thread-safe named counters for the usage statistics (see lemminflect.stats).  The classes that
+# use this hold None instead of an instance when the stats are disabled, so the only cost in
+# that case is the check for None.
+class StatsCounters(object):
+    def __init__(self):
+        self.counts = Counter()
+        self.lock   = threading.Lock()
+
+    def incr(self, name, n=1):
+        with self.lock:
+            self.counts[name] += n
+
+    # Return a dict copy of the counts
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def clear(self):
+        with self.lock:
+            self.counts.clear()
@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import os
+from   lemminflect.codecs.LemmaLUCodec      import LemmaLUCodec
+from   lemminflect.codecs.InflectionLUCodec import InflectionLUCodec
+from   lemminflect.codecs.LexiconBinCodec   import LexiconBinCodec
+from   lemminflect import config
+
+
+# Compile the csv lookup files into the memory-mappable binary format, indexed with a minimal
+# perfect hash.  These are used at run-time when config.lu_format = 'mmap'.  This writes them
+# into the resources directory.  Installed packages can use lemminflect.buildBinLookups(out_dir).
+if __name__ == '__main__':
+    bin_fns = LexiconBinCodec.build(os.path.dirname(config.lemma_lu_bin_fn))
+    for csv_fn, bin_fn, codec in [(config.lemma_lu_fn, bin_fns[0], LemmaLUCodec),
+                                  (config.inflection_lu_fn, bin_fns[1], InflectionLUCodec)]:
+        print('Loading ', csv_fn)
+        lu_dict = codec.load(csv_fn)
+        # Verify the data reads back correctly
+        mapped = LexiconBinCodec.load(bin_fn)
+        assert len(mapped) == len(lu_dict)
+        for word, entry in lu_dict.items():
+            assert mapped[word] == entry, word
+        print('Saved {:,} entries to {} ({:,} bytes)'.format(len(lu_dict), bin_fn,
+            os.path.getsize(bin_fn)))
+    print()
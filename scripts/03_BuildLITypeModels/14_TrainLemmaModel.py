@@ -20,7 +20,6 @@ if __name__ == '__main__':
     rules = ModelLemmaClasses(config.model_lemma_cl_fn)
 
     # Convert data into training format
-    X = []
     Y = []
     input_len = ModelLemmaInData.WVEC_LEN
     input_letters = ModelLemmaInData.getLetterClasses()
@@ -28,10 +27,9 @@ if __name__ == '__main__':
     for entry in indata.entries:
         rule = ModelLemmaClasses.computeSuffixRule(entry.infl, entry.lemma)
         idx = rules.getRuleIndex(rule)
-        vec = ModelLemmaInData.wordToVec(entry.infl, entry.category)
-        X.append( vec )
         Y.append( idx )
-    X = numpy.asarray(X, dtype='float32')
+    X = ModelLemmaInData.wordsToVecs([e.infl for e in indata.entries], \
+                                     [e.category for e in indata.entries])
     Y = numpy.asarray(Y, dtype='int32')
     print('X.shape= ', X.shape)
     print('Y.shape= ', Y.shape)
@@ -17,19 +17,13 @@ if __name__ == '__main__':
     print('Loaded {:,} entries'.format(len(indata.entries)))
 
     # Convert data into training format
-    X = []
-    Y = []
     input_len = ModelInflInData.WVEC_LEN
     input_letters  = ModelInflInData.getLetterClasses()
     output_classes = [SKey.REG, SKey.REGD, SKey.GLREG]
     output_dict    = {k:i for i,k in enumerate(output_classes)}
-    for entry in indata.entries:
-        vec = ModelInflInData.wordToVec(entry.lemma, entry.category)
-        idx = output_dict[entry.source]
-        X.append( vec )
-        Y.append( idx )
-    X = numpy.asarray(X, dtype='float32')
-    Y = numpy.asarray(Y, dtype='int32')
+    X = ModelInflInData.wordsToVecs([e.lemma for e in indata.entries], \
+                                    [e.category for e in indata.entries])
+    Y = numpy.asarray([output_dict[e.source] for e in indata.entries], dtype='int32')
     print('X.shape= ', X.shape)
     print('Y.shape= ', Y.shape)
     print()
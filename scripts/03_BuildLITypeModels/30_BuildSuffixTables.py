@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import os
+from   lemminflect.kmodels.KInfer           import KInferWithNumpy
+from   lemminflect.kmodels.KInferTable      import KInferWithTable, buildSuffixTables
+from   lemminflect.kmodels.ModelLemmaInData import ModelLemmaInData
+from   lemminflect.kmodels.ModelInflInData  import ModelInflInData
+from   lemminflect.kmodels.WordEncoder      import CATEGORY_IDX
+from   lemminflect.codecs.LemmaLUCodec      import LemmaLUCodec
+from   lemminflect.codecs.InflectionLUCodec import InflectionLUCodec
+from   lemminflect.core.LexicalUtils        import uposToCategory, tagToUPos
+from   lemminflect.utils.DataContainer      import DataContainer
+from   lemminflect import config
+
+
+# Words and categories to distill the lemma model with.  Use the training corpus if it's been
+# built, otherwise the words in the lookup table (these are the same words, less the overrides).
+def getLemmaCorpus():
+    if os.path.exists(config.lemma_tcorp_fn):
+        print('Loading ', config.lemma_tcorp_fn)
+        indata = ModelLemmaInData(config.lemma_tcorp_fn)
+        return [(e.infl, e.category) for e in indata.entries]
+    print('Loading ', config.lemma_lu_fn)
+    lemma_dict = LemmaLUCodec.load(config.lemma_lu_fn)
+    return [(word, uposToCategory(upos)) for word, entry in lemma_dict.items() for upos in entry]
+
+def getInflCorpus():
+    if os.path.exists(config.infl_tcorp_fn):
+        print('Loading ', config.infl_tcorp_fn)
+        indata = ModelInflInData(config.infl_tcorp_fn)
+        return [(e.lemma, e.category) for e in indata.entries]
+    print('Loading ', config.inflection_lu_fn)
+    infl_dict = InflectionLUCodec.load(config.inflection_lu_fn)
+    return sorted(set((lemma, uposToCategory(tagToUPos(tag))) for lemma, entry in infl_dict.items() \
+        for tag in entry))
+
+# Keys for the corpus words with the categories they aren't listed with, less the corpus keys.
+# These are like the OOV calls where the upos doesn't match the word, and are further from the
+# corpus than the held out keys.
+def getOtherCategoryKeys(corpus, indata, keys):
+    words = set(w for w, _ in corpus)
+    return sorted(set(indata.wordToKey(w, c) for w in words for c in CATEGORY_IDX) - set(keys))
+
+# Run the keys through the model and return a list of the output indexes
+def getModelOutputs(kinfer, keys):
+    outputs = []
+    for i in range(0, len(keys), 8192):
+        indexes, _ = kinfer.runKeys(keys[i:i+8192])
+        outputs += [int(idx) for idx in indexes]
+    return outputs
+
+# Fraction of the keys where the table and the model agree
+def getAgreement(table, keys, outputs):
+    if not keys:
+        return 0.0
+    indexes, _ = table.runKeys(keys)
+    return sum(1 for a, b in zip(indexes, outputs) if a == b) / len(keys)
+
+def countNodes(node):
+    if node.__class__ is int:
+        return 1
+    return 1 + sum(countNodes(child) for child in node[1].values())
+
+
+# Distill the neural net models into suffix tables for the 'table' inference engine and report
+# how closely they match the models.
+# Every key in the corpus gets the model's exact output.  The agreement for words outside
+# the corpus is estimated by building a table with 10% of the keys held out, and measured on
+# the corpus words with the other categories.
+if __name__ == '__main__':
+    for name, corpus_fn, indata, model_fn, table_fn in [
+            ('lemma', getLemmaCorpus, ModelLemmaInData, config.model_lemma_fn, config.model_lemma_table_fn),
+            ('infl',  getInflCorpus,  ModelInflInData,  config.model_infl_fn,  config.model_infl_table_fn)]:
+        corpus = corpus_fn()
+        keys = sorted(set(indata.wordToKey(w, c) for w, c in corpus if indata.isValidCategory(c)))
+        print('Distilling {} with {:,} words / {:,} unique keys'.format(model_fn, len(corpus), len(keys)))
+        kinfer = KInferWithNumpy(model_fn)
+        outputs = getModelOutputs(kinfer, keys)
+        nletters = indata.WVEC_LEN - 1
+        # Estimate the agreement for unseen words with every 10th key held out
+        meta = {'output_enum':list(kinfer.getOutputEnum()), 'nletters':nletters,
+                'model':os.path.basename(model_fn), 'nkeys':len(keys)}
+        table = KInferWithTable()
+        train = [i for i in range(len(keys)) if i % 10]
+        test  = [i for i in range(len(keys)) if not i % 10]
+        table.setTables(meta, buildSuffixTables([keys[i] for i in train], \
+            [outputs[i] for i in train], nletters))
+        heldout_agree = getAgreement(table, [keys[i] for i in test], [outputs[i] for i in test])
+        # Build the final table with all keys
+        table.setTables(meta, buildSuffixTables(keys, outputs, nletters))
+        corpus_agree = getAgreement(table, keys, outputs)
+        assert corpus_agree == 1.0
+        other_keys = getOtherCategoryKeys(corpus, indata, keys)
+        other_agree = getAgreement(table, other_keys, getModelOutputs(kinfer, other_keys))
+        nnodes = sum(countNodes(node) for node in table.tables.values())
+        # Save it
+        dc = DataContainer()
+        dc.meta = dict(meta, nnodes=nnodes, corpus_agreement=corpus_agree,
+                       heldout_agreement=heldout_agree, other_category_agreement=other_agree)
+        dc.tables = table.tables
+        dc.save(table_fn)
+        print('Agreement report for', name)
+        print('  corpus keys    : {:,}  agreement = {:.2%}'.format(len(keys), corpus_agree))
+        print('  held-out keys  : {:,}  agreement = {:.2%}'.format(len(test), heldout_agree))
+        print('  other category : {:,}  agreement = {:.2%}'.format(len(other_keys), other_agree))
+        print('  table nodes    : {:,}'.format(nnodes))
+        print('Saved to {} ({:,} bytes)'.format(table_fn, os.path.getsize(table_fn)))
+        print()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import os
+from   lemminflect.kmodels.KInfer           import KInferWithNumpy
+from   lemminflect.kmodels.Quantization     import saveQuantizedModel
+from   lemminflect.kmodels.ModelLemmaInData import ModelLemmaInData
+from   lemminflect.kmodels.ModelInflInData  import ModelInflInData
+from   lemminflect.codecs.LemmaLUCodec      import LemmaLUCodec
+from   lemminflect.codecs.InflectionLUCodec import InflectionLUCodec
+from   lemminflect.core.LexicalUtils        import uposToCategory, tagToUPos
+from   lemminflect import config
+
+
+# Unique model keys for the words in the lookup tables
+def getKeys(lu_fn, codec, indata, tag_to_upos):
+    print('Loading ', lu_fn)
+    lu_dict = codec.load(lu_fn)
+    keys = set()
+    for word, entry in lu_dict.items():
+        for tag in entry:
+            category = uposToCategory(tag_to_upos(tag))
+            if indata.isValidCategory(category):
+                keys.add(indata.wordToKey(word, category))
+    return sorted(keys)
+
+def runKeys(kinfer, keys):
+    outputs = []
+    for i in range(0, len(keys), 8192):
+        indexes, _ = kinfer.runKeys(keys[i:i+8192])
+        outputs += [int(idx) for idx in indexes]
+    return outputs
+
+
+# Convert the models to float16 and int8 and report how often they agree with the float32
+# model for the words in the lookup tables.  The converted files are used by the numpy engine
+# when config.kinfer_precision is set.  Without them, the weights are converted at load time.
+if __name__ == '__main__':
+    for name, model_fn, keys_args in [
+            ('lemma', config.model_lemma_fn, (config.lemma_lu_fn, LemmaLUCodec, ModelLemmaInData, lambda t:t)),
+            ('infl',  config.model_infl_fn,  (config.inflection_lu_fn, InflectionLUCodec, ModelInflInData, tagToUPos))]:
+        keys = getKeys(*keys_args)
+        base = KInferWithNumpy(model_fn)
+        base_outputs = runKeys(base, keys)
+        base_bytes = sum(w.nbytes for w in base.weights)
+        print('Agreement report for {} with {:,} keys'.format(name, len(keys)))
+        print('  %-8s  %10s  %10s' % ('', 'weights', 'agreement'))
+        print('  %-8s  %10s  %10s' % ('float32', '{:,}'.format(base_bytes), '100.00%'))
+        for precision in ('float16', 'int8'):
+            out_fn = saveQuantizedModel(model_fn, precision)
+            kinfer = KInferWithNumpy(model_fn, precision=precision)
+            outputs = runKeys(kinfer, keys)
+            agree = sum(1 for a, b in zip(outputs, base_outputs) if a == b) / len(keys)
+            nbytes = sum(w.nbytes for w in kinfer.weights) + \
+                     sum(s.nbytes for s in kinfer.scales if s is not None)
+            print('  %-8s  %10s  %9.2f%%' % (precision, '{:,}'.format(nbytes), 100*agree))
+            print('  Saved to {} ({:,} bytes)'.format(out_fn, os.path.getsize(out_fn)))
+        print()
@@ -31,6 +31,9 @@ setuptools.setup(
     package_data={'lemminflect':['resources/*']},
     packages=setuptools.find_packages(),
     install_requires=['numpy'],
+    # Lets spaCy find the pipeline components without lemminflect being imported first
+    entry_points={'spacy_factories':['lemminflect_lemmatizer = lemminflect.spacy:createLemmatizerComponent'],
+                  'console_scripts':['lemminflect = lemminflect.cli:main']},
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import logging
+import asyncio
+import unittest
+import lemminflect
+from   concurrent.futures import ThreadPoolExecutor
+from   lemminflect.aio import AsyncLemmInflect, MicroBatcher
+
+
+class AsyncTests(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(AsyncTests, self).__init__(*args, **kwargs)
+
+    def testCoalescing(self):
+        words = ['watches', 'Alaskans', 'abscissae', 'xyzzies', 'dogs', 'running']
+        upos  = ['VERB',    'PROPN',    'NOUN',      'NOUN',    'NOUN', 'VERB']
+        tags  = ['VBD',     'NNS',      'NNS',       'NNS',     'NNS',  'VBZ']
+        async def run(api):
+            lemmas = await asyncio.gather(*[api.getLemma(w, u) for w, u in zip(words, upos)])
+            infls  = await asyncio.gather(*[api.getInflection(w, t, False) \
+                                            for w, t in zip(words, tags)])
+            return lemmas, infls, api.numBatches()
+        lemmas, infls, num_batches = asyncio.run(run(AsyncLemmInflect(batch_window=0.05)))
+        self.assertEqual(lemmas, [lemminflect.getLemma(w, u) for w, u in zip(words, upos)])
+        self.assertEqual(infls, [lemminflect.getInflection(w, t, False) for w, t in zip(words, tags)])
+        self.assertEqual(num_batches, {'lemma':1, 'inflection':1})
+
+    def testBatchSize(self):
+        words = ['watches', 'xyzzies', 'dogs', 'geese', 'running']
+        upos  = ['VERB', 'NOUN', 'NOUN', 'NOUN', 'VERB']
+        async def run(api):
+            single = asyncio.ensure_future(api.getLemma('octopi', 'NOUN', False))
+            lemmas = await api.getLemmas(words, upos)
+            return await single, lemmas, api.numBatches()
+        single, lemmas, num_batches = asyncio.run(run(AsyncLemmInflect(max_batch_size=2)))
+        self.assertEqual(single, lemminflect.getLemma('octopi', 'NOUN', False))
+        self.assertEqual(lemmas, lemminflect.getLemmas(words, upos))
+        self.assertEqual(num_batches, {'lemma':3})
+        with self.assertRaises(ValueError):
+            asyncio.run(AsyncLemmInflect().getInflections(['test'], []))
+
+    def testBadSubmission(self):
+        # A bad submission only fails its own caller, not the others in the same window
+        async def run(api):
+            return await asyncio.gather(api.getLemmas([None], ['NOUN']),
+                                        api.getLemma('watches', 'VERB'),
+                                        api.getInflection('watch', 7),
+                                        api.getInflection('watch', 'VBD'),
+                                        return_exceptions=True)
+        results = asyncio.run(run(AsyncLemmInflect(batch_window=0.05)))
+        self.assertIsInstance(results[0], TypeError)
+        self.assertEqual(results[1], ('watch',))
+        self.assertIsInstance(results[2], TypeError)
+        self.assertEqual(results[3], ('watched',))
+        # Errors from the batch function are re-run per submission
+        def batchFunc(items):
+            if 'bad' in items:
+                raise ValueError('bad item')
+            return [item.upper() for item in items]
+        async def runBatcher():
+            executor = ThreadPoolExecutor(max_workers=1)
+            batcher = MicroBatcher(asyncio.get_running_loop(), batchFunc, executor, 0.05, 10)
+            try:
+                return await asyncio.gather(batcher.submit(['a', 'b']), batcher.submit(['bad']),
+                                            batcher.submit(['c']), return_exceptions=True)
+            finally:
+                executor.shutdown()
+        results = asyncio.run(runBatcher())
+        self.assertEqual(results[0], ['A', 'B'])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], ['C'])
+
+
+if __name__ == '__main__':
+    level  = logging.WARNING
+    format = '[%(levelname)s %(filename)s ln=%(lineno)s] %(message)s'
+    #logging.basicConfig(level=level, format=format)
+
+    # run all methods that start with 'test'
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import io
+import os
+import logging
+import subprocess
+import tempfile
+import unittest
+from   lemminflect.cli import processChunk, readChunks, run
+
+
+class CliTests(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(CliTests, self).__init__(*args, **kwargs)
+
+    def testProcessChunk(self):
+        lines = ['The\tDT\n', 'watches\tVBZ\n', 'Alaskans\tNNPS\n', 'xyzzies\tNOUN\n', '.\t.\n', '\n']
+        self.assertEqual(processChunk(lines, 'lemma'),
+            'The\tDT\tThe\nwatches\tVBZ\twatch\nAlaskans\tNNPS\tAlaskan\nxyzzies\tNOUN\txyzzy\n'
+            '.\t.\t.\n\t\n')
+        lines = ['watch,VBD\n', '"a,b",NNS\n', 'xyzzy,NNS\n']
+        self.assertEqual(processChunk(lines, 'inflect', ',', result_only=True, use_oov=False),
+                         'watched\na,b\nxyzzy\n')
+
+    def testWorkers(self):
+        lines = ['watches\tVBZ\n', 'geese\tNNS\n', 'ran\tVERB\n', 'zzfrobbed\tVBD\n'] * 10
+        self.assertEqual([len(c) for c in readChunks(lines, 16)], [16, 16, 8])
+        expected = io.StringIO()
+        run(readChunks(lines, 3), expected, mode='lemma')
+        out = io.StringIO()
+        run(readChunks(lines, 3), out, workers=2, mode='lemma')
+        self.assertEqual(out.getvalue(), expected.getvalue())
+        self.assertEqual(out.getvalue().splitlines()[:4],
+            ['watches\tVBZ\twatch', 'geese\tNNS\tgoose', 'ran\tVERB\trun', 'zzfrobbed\tVBD\tzzfrob'])
+
+    def testBrokenPipe(self):
+        # Closing the output early (ie.. piped to head) exits with 1 and nothing on stderr
+        proj_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+        env = dict(os.environ, PYTHONPATH=proj_dir)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            in_fn = os.path.join(tmpdir, 'in.tsv')
+            with open(in_fn, 'w') as f:
+                f.write('watches\tVERB\n' * 200000)
+            proc = subprocess.Popen([sys.executable, '-m', 'lemminflect.cli', 'lemma', in_fn,
+                                     '--no-oov', '--chunk-size', '100'], stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, env=env)
+            self.assertEqual(proc.stdout.readline(), b'watches\tVERB\twatch\n')
+            proc.stdout.close()
+            self.assertEqual(proc.wait(60), 1)
+            self.assertEqual(proc.stderr.read(), b'')
+            proc.stderr.close()
+
+
+if __name__ == '__main__':
+    level  = logging.WARNING
+    format = '[%(levelname)s %(filename)s ln=%(lineno)s] %(message)s'
+    #logging.basicConfig(level=level, format=format)
+
+    # run all methods that start with 'test'
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import logging
+import unittest
+import numpy
+import lemminflect
+
+
+class ColumnarTests(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ColumnarTests, self).__init__(*args, **kwargs)
+
+    def testLemmaArray(self):
+        words = numpy.array(['watches', 'Alaskans', 'xyzzies', 'watches', 'the'] * 2)
+        upos  = ['VERB', 'PROPN', 'NOUN', 'NOUN', 'PUNCT'] * 2
+        with self.assertLogs():
+            lemmas, is_oov = lemminflect.getLemmaArray(words.reshape(2, 5), upos)
+        self.assertEqual(lemmas.shape, (2, 5))
+        self.assertEqual(list(lemmas[1]), ['watch', 'Alaskan', 'xyzzy', 'watch', 'the'])
+        self.assertEqual(list(is_oov[0]), [False, False, True, False, False])
+        lemmas, _ = lemminflect.getLemmaArray(['xyzzies', 'dogs'], 'NOUN', False, False)
+        self.assertEqual(list(lemmas), [None, 'dog'])
+        with self.assertRaises(ValueError):
+            lemminflect.getLemmaArray(['dogs', 'cats'], ['NOUN'])
+
+    def testInflectionArray(self):
+        infls, is_oov = lemminflect.getInflectionArray(['watch', 'be', 'xyzzy'], ['VBD', 'VBZ', 'NNS'])
+        self.assertEqual(list(infls), ['watched', 'is', 'xyzzies'])
+        self.assertEqual(list(is_oov), [False, False, True])
+        infls, _ = lemminflect.getInflectionArray(['xyzzy', 'dog'], 'NNS', False, False)
+        self.assertEqual(list(infls), [None, 'dogs'])
+
+    def testMissingValues(self):
+        # Missing values (None, NaN) are skipped, like invalid tags
+        words = numpy.array(['cats', None, float('nan')], dtype=object)
+        lemmas, is_oov = lemminflect.getLemmaArray(words, 'NOUN')
+        self.assertEqual(lemmas[:2].tolist(), ['cat', None])
+        self.assertIs(lemmas[2], words[2])
+        self.assertEqual(list(is_oov), [False, False, False])
+        lemmas, _ = lemminflect.getLemmaArray(words, 'NOUN', on_empty_ret_word=False)
+        self.assertEqual(list(lemmas), ['cat', None, None])
+        with self.assertLogs():     # only the invalid tag on 'cats' is counted
+            infls, is_oov = lemminflect.getInflectionArray(words, [None, 'NNS', 1.0])
+        self.assertEqual(infls[:2].tolist(), ['cats', None])
+        self.assertEqual(list(is_oov), [False, False, False])
+
+
+if __name__ == '__main__':
+    level  = logging.WARNING
+    format = '[%(levelname)s %(filename)s ln=%(lineno)s] %(message)s'
+    #logging.basicConfig(level=level, format=format)
+
+    # run all methods that start with 'test'
+    unittest.main()
@@ -148,6 +148,20 @@ class InflectionRulesTests(unittest.TestCase):
         self.assertEqual(lemminflect.getInflection('xxgenesis', 'NNS', inflect_oov=True), ('xxgeneses',))      # glreg
         self.assertEqual(lemminflect.getInflection('xxalumus',  'NNS', inflect_oov=True), ('xxalumi',))        # glreg
 
+    def testGetInflectionBatch(self):
+        lemmas = ['xxbike', 'xxbaggy', 'xxclean', 'xxformat', 'xxbacklog', 'xxgenesis', 'Xxalumus',
+                  'watch', 'WATCH', 'Alaskan', 'be', 'test', 'xxbike']
+        tags   = ['NNS',    'JJR',     'RBS',     'VBG',      'VBD',       'NNS',       'NNS',
+                  'VBD',   'VBZ',   'NNPS',    'VBD', 'X',    'NN']
+        for inflect_oov in (True, False):
+            lemminflect.clearCaches()
+            expected = [lemminflect.getInflection(l, t, inflect_oov) for l, t in zip(lemmas, tags)]
+            lemminflect.clearCaches()
+            infls = lemminflect.getInflections(lemmas, tags, inflect_oov)
+            self.assertEqual(infls, expected)
+            # again with the cached results
+            self.assertEqual(lemminflect.getInflections(lemmas, tags, inflect_oov), expected)
+
 
 if __name__ == '__main__':
     # run all methods that start with 'test'
@@ -5,6 +5,7 @@ import logging
 import unittest
 import spacy
 import lemminflect
+from   lemminflect.codecs.OverridesCodec import OverridesCodec
 
 
 # UnitTest creates a separate instance of the class for each test in it.
@@ -117,10 +118,11 @@ class InflectionTests(unittest.TestCase):
         self.assertEqual(token._.inflect('NNPS', inflect_oov=True), 'Axxlaskans')
 
     def testOverrides(self):
-        # run the inflection system once to assure the overrides is loaded (ie.. lazy loading)
+        # run the inflection system once to assure the lookup is loaded (ie.. lazy loading)
         lemminflect.getInflection('watch', 'VBD'), ('watched',)
-        # Hack the code to replace the overrides dictionary
-        orig_dict = lemminflect.Inflections().overrides_dict
+        # Hack the code to merge a new override into the lookup (as is done on load)
+        infl_dict = lemminflect.Inflections().infl_dict
+        orig_entry = dict(infl_dict['watch'])
         with self.assertLogs():
             lemmas = lemminflect.getLemma('WORD', 'X')
         self.assertEqual(lemmas, ())
@@ -132,11 +134,13 @@ class InflectionTests(unittest.TestCase):
         self.assertEqual(lemmas, {})
         token = self.nlp('I')[0]
         self.assertEqual(token._.lemma(), 'I')
-        lemminflect.Inflections().overrides_dict = {'watch':{'VBD':('xxx',)}}
+        OverridesCodec.apply(infl_dict, {'watch':{'VBD':('xxx',)}})
+        lemminflect.clearCaches()    # drop any results cached before the hack
         inflections = lemminflect.getInflection('watch', 'VBD', inflect_oov=False)
         self.assertEqual(inflections, ('xxx',))
-        # put the original dictionary back
-        lemminflect.Inflections().overrides_dict = orig_dict
+        # put the original entry back
+        infl_dict['watch'] = orig_entry
+        lemminflect.clearCaches()
 
     def testUPOSLog(self):
         with self.assertLogs():
@@ -6,6 +6,10 @@ import unittest
 import numpy
 from   lemminflect.core.LemmatizerRules import LemmatizerRules
 from   lemminflect.core.Lemmatizer import Lemmatizer
+from   lemminflect.kmodels.ModelLemmaInData import ModelLemmaInData
+from   lemminflect.kmodels import KInfer
+from   lemminflect.kmodels.KInfer import KInferWithNumpy
+from   lemminflect import config
 
 
 class LemmatizerRulesTests(unittest.TestCase):
@@ -50,6 +54,120 @@ class LemmatizerRulesTests(unittest.TestCase):
             lemma = lemmas[0]
             self.assertEqual(lemma, test[2])
 
+    def testNumpyInferBatch(self):
+        oov_lemmatizer = LemmatizerRules(kitype='numpy')
+        tests = self.getTestCases()
+        words = [t[0] for t in tests] + ['test']
+        upos  = [t[1] for t in tests] + ['X']
+        lemmas = oov_lemmatizer.lemmatizeBatch(words, upos)
+        self.assertEqual(lemmas, [t[2] for t in tests] + [None])
+
+    def testSuffixCache(self):
+        oov_lemmatizer = LemmatizerRules(kitype='numpy')
+        # All of these have the same last 8 letters
+        words = ['xxreorganizing', 'yyREORGANIZING', 'Disorganizing', 'reorganizing']
+        lemmas = oov_lemmatizer.lemmatizeBatch(words, ['VERB']*len(words))
+        self.assertEqual(lemmas, ['xxreorganize', 'yyREORGANIZe', 'Disorganize', 'reorganize'])
+        self.assertEqual(oov_lemmatizer.cache.cacheInfo().currsize, 1)
+        self.assertEqual(oov_lemmatizer.lemmatize('zzorganizing', 'VERB'), 'zzorganize')
+        self.assertEqual(oov_lemmatizer.cache.cacheInfo().hits, 1)
+        self.assertEqual(ModelLemmaInData.wordToKey("O'Clock", 'noun'), ('noun', "kcolc#o"))
+        self.assertEqual(ModelLemmaInData.wordToKey('reorganizing', 'verb'), ('verb', 'gnizinag'))
+
+    def testWordsToVecs(self):
+        words = ['abases', 'ABBREVIATING', "o'clock", 'a', '', 'naïve-ization', 'İs']
+        cats  = ['verb', 'verb', 'noun', 'adj', 'adv', 'noun', 'verb']
+        X = ModelLemmaInData.wordsToVecs(words, cats)
+        for i, (word, cat) in enumerate(zip(words, cats)):
+            self.assertTrue(numpy.array_equal(X[i], ModelLemmaInData.wordToVec(word, cat)), word)
+        # Re-use the buffer for a smaller batch
+        X2 = ModelLemmaInData.wordsToVecs(words[:2], cats[:2], out=X)
+        self.assertEqual(X2.shape, (2, 9, 28))
+        self.assertTrue(numpy.shares_memory(X, X2))
+        self.assertTrue(numpy.array_equal(X2[1], ModelLemmaInData.wordToVec(words[1], cats[1])))
+        with self.assertRaises(ValueError):
+            ModelLemmaInData.wordsToVecs(['test'], ['aux'])
+
+    def testLemmaBatch(self):
+        lemmatizer = Lemmatizer()
+        words = ['watches', 'Watches', 'XATCHES', 'Alaskans', 'abscissae', 'is', 'dogs', 'xyzzies']
+        upos  = ['VERB',    'NOUN',    'NOUN',    'PROPN',    'NOUN',      'AUX', 'X',  'NOUN']
+        expected = [lemmatizer.getLemma(w, u) for w, u in zip(words, upos)]
+        self.assertEqual(lemmatizer.getLemmaBatch(words, upos), expected)
+        expected = [lemmatizer.getLemma(w, u, False) for w, u in zip(words, upos)]
+        self.assertEqual(lemmatizer.getLemmaBatch(words, upos, False), expected)
+
+    def testTableInfer(self):
+        oov_lemmatizer = LemmatizerRules(kitype='table')
+        tests = self.getTestCases()
+        for test in tests:
+            lemma = oov_lemmatizer.lemmatize( test[0], test[1] )
+            self.assertEqual(lemma, test[2])
+        # The table should match the model for the words it was built from, and the
+        # vector based interface should give the same results as the keys
+        nn_lemmatizer = LemmatizerRules(kitype='numpy')
+        words = ['watches', 'abscissae', 'bigger', 'fastest', 'running', 'a', "o'clock", 'geese']
+        cats  = ['verb',    'noun',      'adj',    'adv',     'verb',    'noun', 'adv',   'noun']
+        keys  = [ModelLemmaInData.wordToKey(w, c) for w, c in zip(words, cats)]
+        indexes, _ = oov_lemmatizer.kinfer.runKeys(keys)
+        self.assertEqual(indexes, list(nn_lemmatizer.kinfer.runKeys(keys)[0]))
+        X = ModelLemmaInData.wordsToVecs(words, cats)
+        self.assertEqual(oov_lemmatizer.kinfer.runBatch(X)[0], indexes)
+        self.assertEqual(oov_lemmatizer.kinfer.run(X[1])[0], indexes[1])
+
+    def testGatherInfer(self):
+        # The sparse first layer used by runKeys should give the same outputs as the dense model
+        kinfer = LemmatizerRules(kitype='numpy').kinfer
+        words = ['abases', 'ABBREVIATING', "o'clock", 'a', '', 'naïve-ization', 'achier', 'geese']
+        cats  = ['verb', 'verb', 'noun', 'adj', 'adv', 'noun', 'adj', 'noun']
+        keys  = [ModelLemmaInData.wordToKey(w, c) for w, c in zip(words, cats)]
+        expected, _ = kinfer.runBatch(ModelLemmaInData.wordsToVecs(words, cats))
+        for batch in (keys[:1], keys, keys*3):     # single, small and large batch index paths
+            indexes, _ = kinfer.runKeys(batch)
+            self.assertEqual(list(indexes), list(expected[:len(batch)]) * (len(batch)//len(keys) or 1))
+        with self.assertRaises(ValueError):
+            kinfer.runKeys([('aux', 'tset')])
+
+    def testLayerPlan(self):
+        # The compiled plan should give the same outputs as running the model directly.  The
+        # softmax doesn't change the argmax so it's left out.
+        kinfer = KInferWithNumpy(config.model_lemma_fn)
+        plan = kinfer.getPlan()
+        self.assertEqual([s.activation_name for s in plan], ['relu', 'linear'])
+        self.assertTrue(all(s.W.dtype == numpy.float32 and s.W.flags.c_contiguous for s in plan))
+        words = ['abases', 'ABBREVIATING', "o'clock", 'a', 'naïve-ization', 'achier', 'geese']
+        cats  = ['verb', 'verb', 'noun', 'adj', 'noun', 'adj', 'noun']
+        X = ModelLemmaInData.wordsToVecs(words, cats)
+        W1, b1, W2, b2 = kinfer.weights
+        Y = numpy.maximum(numpy.dot(X.reshape(X.shape[0], -1), W1) + b1, 0).dot(W2) + b2
+        indexes, _ = kinfer.runBatch(X)
+        self.assertEqual(list(indexes), list(numpy.argmax(Y, axis=-1)))
+        with self.assertRaises(ValueError):
+            kinfer.runBatch(X[:, :-1])
+
+    def testQuantizedInfer(self):
+        tests = self.getTestCases()
+        for precision in ('float16', 'int8'):
+            kinfer = KInferWithNumpy(config.model_lemma_fn, precision=precision)
+            oov_lemmatizer = LemmatizerRules(kinfer=kinfer)
+            for test in tests:
+                lemma = oov_lemmatizer.lemmatize( test[0], test[1] )
+                self.assertEqual(lemma, test[2])
+        self.assertEqual(kinfer.weights[0].dtype, numpy.int8)
+        with self.assertRaises(ValueError):
+            KInferWithNumpy(config.model_lemma_fn, precision='int4')
+        # The kernel is converted in blocks of rows, with the same result as converting it at once
+        W = kinfer.weights[0]
+        x = numpy.random.RandomState(0).rand(5, W.shape[0]).astype('float32')
+        expected = numpy.dot(x, W.astype('float32'))
+        saved = KInfer.KERNEL_BLOCK_SIZE
+        try:
+            KInfer.KERNEL_BLOCK_SIZE = 10 * W.shape[1]
+            numpy.testing.assert_allclose(KInfer.dotKernel(x, W), expected, rtol=1e-5, atol=1e-3)
+        finally:
+            KInfer.KERNEL_BLOCK_SIZE = saved
+        numpy.testing.assert_allclose(KInfer.dotKernel(x, W), expected, rtol=1e-5, atol=1e-3)
+
     def testLemmatizer02(self):
         lemmatizer = Lemmatizer()
         with self.assertLogs():
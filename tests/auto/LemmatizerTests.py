@@ -5,6 +5,7 @@ import logging
 import unittest
 import spacy
 import lemminflect
+from   lemminflect.codecs.OverridesCodec import OverridesCodec
 
 
 # UnitTest creates a separate instance of the class for each test in it.
@@ -226,15 +227,18 @@ class LemmatizerTests(unittest.TestCase):
         self.runGetLemmaTests(tests)
 
     def testOverrides(self):
-        # run the lemmatizer once to assure the overrides is loaded (ie.. lazy loading)
+        # run the lemmatizer once to assure the lookup is loaded (ie.. lazy loading)
         lemminflect.getLemma('Alaskans', 'NOUN', lemmatize_oov=False)
-        # Hack the code to replace the overrides dictionary
-        orig_dict = lemminflect.Lemmatizer().overrides_dict
-        lemminflect.Lemmatizer().overrides_dict = {'waltzes':{'VERB':('xxx',)}}
+        # Hack the code to merge a new override into the lookup (as is done on load)
+        lemma_dict = lemminflect.Lemmatizer().lemma_dict
+        orig_entry = dict(lemma_dict['waltzes'])
+        OverridesCodec.apply(lemma_dict, {'waltzes':{'VERB':('xxx',)}})
+        lemminflect.clearCaches()    # drop any results cached before the hack
         lemmas = lemminflect.getLemma('waltzes', 'VERB', lemmatize_oov=False)
         self.assertEqual(lemmas, ('xxx',))
-        # put the original dictionary back
-        lemminflect.Lemmatizer().overrides_dict = orig_dict
+        # put the original entry back
+        lemma_dict['waltzes'] = orig_entry
+        lemminflect.clearCaches()
 
     def testUPOSLog(self):
         with self.assertLogs():
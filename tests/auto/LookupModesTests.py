@@ -0,0 +1,356 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import os
+import time
+import logging
+import unittest
+import subprocess
+import tempfile
+import multiprocessing
+import threading
+import numpy
+import lemminflect
+from   types import MappingProxyType
+from   lemminflect.core.Lemmatizer  import Lemmatizer
+from   lemminflect.core.Inflections import Inflections
+from   lemminflect.core.UnifiedLexicon import UnifiedLexicon
+from   lemminflect.core import SharedData
+from   lemminflect.codecs.LemmaLUCodec      import LemmaLUCodec
+from   lemminflect.codecs.InflectionLUCodec import InflectionLUCodec
+from   lemminflect.codecs.LexiconBinCodec   import LexiconBinCodec, MappedLexicon
+from   lemminflect.codecs.OverridesCodec    import OverridesCodec
+from   lemminflect.utils.LRUCache           import LRUCache
+from   lemminflect.utils.Interning          import LookupInterner
+from   lemminflect import config
+
+
+class LookupModesTests(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(LookupModesTests, self).__init__(*args, **kwargs)
+
+    def tearDown(self):
+        Lemmatizer().setReadOnlyResults(False)
+        Inflections().setReadOnlyResults(False)
+
+    def testReadOnlyLemmas(self):
+        lemmatizer = Lemmatizer()
+        tests = [('watches', None), ('Watches', None), ('WATCHES', 'VERB'), ('Alaskans', 'PROPN'),
+                 ('all', 'NOUN'), ('xxwatches', None)]
+        for word, upos in tests:
+            lemmatizer.setReadOnlyResults(False)
+            expected = lemmatizer.getAllLemmas(word, upos)
+            self.assertIsInstance(expected, dict)
+            lemmatizer.setReadOnlyResults(True)
+            lemmas = lemmatizer.getAllLemmas(word, upos)
+            self.assertIsInstance(lemmas, MappingProxyType)
+            self.assertEqual(dict(lemmas), expected)
+        with self.assertRaises(TypeError):
+            lemmas['VERB'] = ('test',)
+
+    def testReadOnlyInflections(self):
+        inflections = Inflections()
+        tests = [('watch', None), ('Watch', 'VERB'), ('WATCH', None), ('Alaskan', 'PROPN'),
+                 ('burn', 'VERB'), ('xxwatch', None)]
+        for lemma, upos in tests:
+            inflections.setReadOnlyResults(False)
+            expected = inflections.getAllInflections(lemma, upos)
+            self.assertIsInstance(expected, dict)
+            inflections.setReadOnlyResults(True)
+            forms = inflections.getAllInflections(lemma, upos)
+            self.assertIsInstance(forms, MappingProxyType)
+            self.assertEqual(dict(forms), expected)
+        self.assertEqual(inflections.getInflection('Watch', 'VBD'), ('Watched',))
+
+    def testMergedOverrides(self):
+        lemmatizer = Lemmatizer()
+        self.assertTrue(lemmatizer.isOverride('all', 'NOUN'))
+        self.assertFalse(lemmatizer.isOverride('watches', 'VERB'))
+        self.assertEqual(lemmatizer.getAllLemmas('all', 'NOUN'), {'NOUN':('all',)})
+        inflections = Inflections()
+        self.assertTrue(inflections.isOverride('burn', 'VBN'))
+        self.assertFalse(inflections.isOverride('burn', 'VBD'))
+        self.assertEqual(inflections.getInflection('burn', 'VBN'), ('burned',))
+        self.assertEqual(inflections.getInflection('Burn', 'VBN'), ('Burned',))
+
+    def testUnifiedLexicon(self):
+        lexicon = UnifiedLexicon()
+        lemma_dict = lexicon.getLemmaDict()
+        expected = LemmaLUCodec.load(config.lemma_lu_fn)
+        self.assertEqual(len(lemma_dict), len(expected))
+        for word, entry in expected.items():
+            self.assertEqual(lemma_dict[word], entry, word)
+        self.assertEqual(lexicon.getInflDict(), InflectionLUCodec.load(config.inflection_lu_fn))
+        self.assertIsNone(lemma_dict.get('xxwatches'))
+        # The strings are shared between the 2 indexes
+        infl_dict = lexicon.getInflDict()
+        self.assertIs(lemma_dict['watches']['VERB'][0], infl_dict['watch']['VB'][0])
+        self.assertIs(lemma_dict['watches']['VERB'][0], lemma_dict['watched']['VERB'][0])
+        # Overrides are held in each index returned, not in the lexicon
+        OverridesCodec.apply(lemma_dict, {'watches':{'NOUN':('watchez',)}})
+        self.assertEqual(lemma_dict['watches'], {'NOUN':('watchez',), 'VERB':('watch',)})
+        self.assertEqual(lexicon.getLemmaDict()['watches'], expected['watches'])
+
+    def testInternedLoad(self):
+        for codec, fn in [(LemmaLUCodec, config.lemma_lu_fn),
+                          (InflectionLUCodec, config.inflection_lu_fn)]:
+            lu_dict = codec.load(fn)
+            interner = LookupInterner()
+            interned = codec.load(fn, interner)
+            self.assertEqual(interned, lu_dict)
+            self.assertEqual(list(interned), list(lu_dict))
+            self.assertGreater(interner.bytes_saved, 0)
+        # The base form tuples and the strings in them are shared
+        self.assertIsNot(lu_dict['watch']['VB'], lu_dict['watch']['VBP'])
+        self.assertIs(interned['watch']['VB'], interned['watch']['VBP'])
+        watch = [w for w in interned if w == 'watch'][0]
+        self.assertIs(interned['watch']['NN'][0], watch)
+        # Identical entries are shared
+        interner = LookupInterner()
+        entries = [{interner.internString(t):interner.internSpellings(s)} for t, s in \
+                   [('NOUN', ('a',)), ('NOUN', ('a',)), ('VERB', ('a',))]]
+        entries = [interner.internEntry(e) for e in entries]
+        self.assertIs(entries[0], entries[1])
+        self.assertIsNot(entries[0], entries[2])
+
+    def testMappedLexicon(self):
+        lemma_dict = LemmaLUCodec.load(config.lemma_lu_fn)
+        mapped = MappedLexicon(LexiconBinCodec.toBytes(lemma_dict))
+        self.assertEqual(len(mapped), len(lemma_dict))
+        for word in ['watches', "'d", 'Aaron', 'bigger', 'élan']:
+            self.assertEqual(mapped.get(word), lemma_dict.get(word))
+        self.assertFalse('xxwatches' in mapped)
+        self.assertIsNone(mapped.get('xxwatches'))
+        # Overrides are held on top of the mapped data
+        OverridesCodec.apply(mapped, {'watches':{'NOUN':('watchez',)}, 'xxwatches':{'VERB':('x',)}})
+        self.assertEqual(mapped['watches'], {'NOUN':('watchez',), 'VERB':('watch',)})
+        self.assertEqual(mapped['xxwatches'], {'VERB':('x',)})
+        self.assertEqual(len(mapped), len(lemma_dict)+1)
+
+    def testPerfectHashIndex(self):
+        infl_dict = InflectionLUCodec.load(config.inflection_lu_fn)
+        data = LexiconBinCodec.toBytes(infl_dict, index='hash')
+        self.assertEqual(MappedLexicon(data).version, 2)
+        self.assertEqual(MappedLexicon(LexiconBinCodec.toBytes(infl_dict, 'sorted')).version, 1)
+        # All the keys are found, both in memory and memory-mapped from the file
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bin_fn = os.path.join(tmpdir, 'infl_lu.bin')
+            with open(bin_fn, 'wb') as f:
+                f.write(data)
+            for mapped in (MappedLexicon(data), LexiconBinCodec.load(bin_fn)):
+                self.assertEqual(dict(mapped.items()), infl_dict)
+                for word in ['xxwatch', '', 'Watch', 'watch ']:
+                    self.assertIsNone(mapped.get(word))
+                    self.assertFalse(word in mapped)
+        # Small and empty tables
+        for lu_dict in ({}, {'a':{'NN':('a',)}}, {'a':{'NN':('a',)}, 'b':{'NN':('b',)}}):
+            self.assertEqual(dict(MappedLexicon(LexiconBinCodec.toBytes(lu_dict)).items()), lu_dict)
+
+    def testBuildBinLookups(self):
+        saved = config.lu_format, config.lu_bin_dir
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bin_fns = lemminflect.buildBinLookups(os.path.join(tmpdir, 'lu_bin'))
+            self.assertEqual([os.path.basename(fn) for fn in bin_fns], ['lemma_lu.bin', 'infl_lu.bin'])
+            config.lu_format, config.lu_bin_dir = 'mmap', os.path.dirname(bin_fns[0])
+            try:
+                # Use new, non-singleton, instances so the data is loaded from the new files
+                lemmatizer = object.__new__(Lemmatizer)
+                lemmatizer.__init__()
+                self.assertEqual(lemmatizer.getLemma('watches', 'VERB'), ('watch',))
+                self.assertIsInstance(lemmatizer.lemma_dict, MappedLexicon)
+                inflections = object.__new__(Inflections)
+                inflections.__init__()
+                self.assertEqual(inflections.getInflection('watch', 'VBD'), ('watched',))
+                self.assertIsInstance(inflections.infl_dict, MappedLexicon)
+                del lemmatizer, inflections     # release the memory-mapped files
+            finally:
+                config.lu_format, config.lu_bin_dir = saved
+
+    def testLRUCache(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)     # 'a' is now most recent
+        cache.put('c', 3)                       # evicts 'b'
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.cacheInfo(), (1, 1, 2, 2))
+        cache.setMaxSize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get('c'), 3)
+        cache.clear()
+        self.assertEqual(cache.cacheInfo(), (0, 0, 1, 0))
+        cache.setMaxSize(0)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+    def testResultCaches(self):
+        lemmatizer = Lemmatizer()
+        lemmatizer.clearCache()
+        self.assertEqual(lemmatizer.getLemma('Xxwatches', 'VERB'), ('Xxwatch',))
+        self.assertEqual(lemmatizer.getLemma('Xxwatches', 'VERB'), ('Xxwatch',))
+        self.assertEqual(lemmatizer.getLemma('xxwatches', 'VERB'), ('xxwatch',))
+        self.assertEqual(lemmatizer.getLemma('xxwatches', 'VERB', False), ())
+        self.assertEqual(lemmatizer.cacheInfo().hits, 1)
+        self.assertEqual(lemmatizer.cacheInfo().currsize, 3)
+        self.assertEqual(lemmatizer.getLemmaBatch(['xxwatches', 'dogs'], ['VERB', 'NOUN']),
+            [('xxwatch',), ('dog',)])
+        self.assertEqual(lemmatizer.cacheInfo().hits, 2)
+        with self.assertLogs():
+            lemmatizer.getLemma('test', 'X')
+        with self.assertLogs():     # invalid upos isn't cached
+            lemmatizer.getLemma('test', 'X')
+        inflections = Inflections()
+        inflections.clearCache()
+        self.assertEqual(inflections.getInflection('xxwatch', 'VBD'), ('xxwatched',))
+        self.assertEqual(inflections.getInflection('xxwatch', 'VBD'), ('xxwatched',))
+        self.assertEqual(inflections.cacheInfo(), (1, 1, config.infl_cache_size, 1))
+
+    def testStats(self):
+        lemminflect.clearCaches()
+        lemminflect.setCollectStats(True)
+        try:
+            lemminflect.getLemma('another', 'NOUN')
+            lemminflect.getLemma('Alaskans', 'PROPN')
+            with self.assertLogs():
+                lemminflect.getLemmas(['xxwatches', 'dogs', 'test'], ['VERB', 'NOUN', 'X'])
+            # Same model key as 'xxwatches' so the model isn't run again
+            lemminflect.getLemma('yxwatches', 'VERB')
+            lemminflect.getInflection('big', 'RBR')
+            lemminflect.getInflection('xxwatch', 'VBD')
+            stats = lemminflect.stats()
+        finally:
+            lemminflect.setCollectStats(False)
+        self.assertEqual(stats['lemma']['counters'], {'dict_hits':3, 'dict_misses':2,
+            'override_hits':1, 'propn_conversions':1, 'invalid_upos':1, 'oov_requests':2,
+            'oov_words':2, 'oov_model_runs':1, 'oov_model_keys':1})
+        self.assertEqual(stats['inflection']['counters'], {'dict_hits':1, 'dict_misses':1,
+            'tag_alt_fallbacks':1, 'oov_requests':1, 'oov_words':1, 'oov_model_runs':1,
+            'oov_model_keys':1})
+        self.assertIn('lemma_lu', stats['lemma']['load_secs'])
+        self.assertEqual(lemminflect.stats()['lemma']['counters'], {})
+
+    def testSharedData(self):
+        spec = lemminflect.publishSharedData()
+        try:
+            self.assertEqual(set(spec), {'lemma_lu', 'infl_lu', 'lemma_model', 'infl_model'})
+            words = ['watches', 'xxwatches', 'all', 'Alaskans', 'abscissae', 'zzbigger']
+            upos  = ['VERB',    'VERB',      'NOUN', 'PROPN',   'NOUN',      'ADJ']
+            lemmas = [lemminflect.getLemma(w, u) for w, u in zip(words, upos)]
+            lemmas += [lemminflect.getInflection('xxformat', 'VBG'), lemminflect.getInflection('burn', 'VBN')]
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(2, initializer=lemminflect.attachSharedData, initargs=(spec,)) as pool:
+                results = pool.starmap(lemminflect.getLemma, zip(words, upos))
+                results += pool.starmap(lemminflect.getInflection, [('xxformat', 'VBG'), ('burn', 'VBN')])
+            self.assertEqual(results, lemmas)
+            # The model's weights should be used from the shared memory, not copied
+            kinfer = SharedData._attachModel(spec['lemma_model'])
+            shm_buf = numpy.frombuffer(SharedData._attached[-1].buf, dtype=numpy.uint8)
+            self.assertTrue(all(numpy.shares_memory(w, shm_buf) for w in kinfer.weights))
+            del shm_buf
+        finally:
+            lemminflect.unlinkSharedData()
+
+    def testSharedDataPrecision(self):
+        from lemminflect.kmodels.KInfer import KInferWithNumpy
+        from lemminflect.kmodels.ModelLemmaInData import ModelLemmaInData
+        saved = config.kinfer_precision
+        config.kinfer_precision = 'int8'
+        try:
+            spec = lemminflect.publishSharedData()
+        finally:
+            config.kinfer_precision = saved
+        try:
+            kinfer = SharedData._attachModel(spec['lemma_model'])
+            shm_buf = numpy.frombuffer(SharedData._attached[-1].buf, dtype=numpy.uint8)
+            self.assertEqual(kinfer.precision, 'int8')
+            self.assertEqual(kinfer.weights[0].dtype, numpy.int8)
+            self.assertTrue(all(numpy.shares_memory(w, shm_buf) for w in kinfer.weights))
+            del shm_buf
+            # Same results as the int8 model loaded in this process
+            keys = [ModelLemmaInData.wordToKey(w, c) for w, c in
+                    [('xxwatches', 'verb'), ('zzbigger', 'adj'), ('abscissae', 'noun')]]
+            expected = KInferWithNumpy(config.model_lemma_fn, precision='int8')
+            self.assertEqual(kinfer.runKeys(keys)[1], expected.runKeys(keys)[1])
+        finally:
+            lemminflect.unlinkSharedData()
+
+    def testSharedDataClearsCaches(self):
+        # Use new, non-singleton, instances so the shared singletons aren't changed
+        lemmatizer = object.__new__(Lemmatizer)
+        lemmatizer.__init__()
+        self.assertEqual(lemmatizer.getLemma('watches', 'VERB'), ('watch',))
+        lemmatizer.setSharedData(LexiconBinCodec.toBytes({'watches':{'VERB':('wotch',)}}))
+        self.assertEqual(lemmatizer.getLemma('watches', 'VERB'), ('wotch',))
+        inflections = object.__new__(Inflections)
+        inflections.__init__()
+        self.assertEqual(inflections.getInflection('watch', 'VBD'), ('watched',))
+        inflections.setSharedData(LexiconBinCodec.toBytes({'watch':{'VBD':('wotched',)}}))
+        self.assertEqual(inflections.getInflection('watch', 'VBD'), ('wotched',))
+
+    def testThreadSafeLoading(self):
+        # Use new, non-singleton, instances so the data hasn't been loaded yet
+        lemmatizer = object.__new__(Lemmatizer)
+        lemmatizer.__init__()
+        results = []
+        def load():
+            results.append(lemmatizer._getLemmaDict())
+        threads = [threading.Thread(target=load) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def testPreload(self):
+        lemminflect.preload(['lemma', 'inflection'], background=True)
+        self.assertTrue(lemminflect.waitUntilLoaded(60))
+        self.assertTrue(hasattr(Lemmatizer(), 'lemma_dict'))
+        self.assertTrue(hasattr(Inflections(), 'infl_dict'))
+        lemminflect.preload(['lemma_oov'])
+        self.assertTrue(hasattr(Lemmatizer(), 'oov_lemmatizer'))
+        with self.assertRaises(ValueError):
+            lemminflect.preload(['lemmas'])
+
+    def testPreloadWait(self):
+        from lemminflect.core import Preload
+        event = threading.Event()
+        def fail():
+            raise RuntimeError('test')
+        Preload.LOADERS.update({'test_wait':event.wait, 'test_fail':fail})
+        try:
+            # The timeout is for all the threads, not each one
+            for _ in range(3):
+                lemminflect.preload(['test_wait'], background=True)
+            st = time.monotonic()
+            self.assertFalse(lemminflect.waitUntilLoaded(0.2))
+            self.assertLess(time.monotonic() - st, 0.5)
+            event.set()
+            with self.assertLogs():
+                lemminflect.preload(['test_fail'], background=True)
+                with self.assertRaises(RuntimeError):
+                    lemminflect.waitUntilLoaded(10)
+            # The error is only raised once
+            self.assertTrue(lemminflect.waitUntilLoaded(10))
+        finally:
+            event.set()
+            del Preload.LOADERS['test_wait'], Preload.LOADERS['test_fail']
+
+    def testLazyImports(self):
+        # Importing and dictionary lookups shouldn't import numpy or spacy or create the singletons
+        lib_dir = os.path.dirname(os.path.dirname(os.path.abspath(lemminflect.__file__)))
+        code = 'import sys; sys.path.insert(0, %r); import lemminflect; ' % lib_dir + \
+               'from lemminflect.utils.Singleton import _Singleton; ' + \
+               'print(len(_Singleton._instances), end=" "); lemminflect.getLemma("watches", "VERB"); ' + \
+               'print("numpy" in sys.modules, "spacy" in sys.modules)'
+        out = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+        self.assertEqual(out.strip(), '0 False False')
+
+
+if __name__ == '__main__':
+    level  = logging.WARNING
+    format = '[%(levelname)s %(filename)s ln=%(lineno)s] %(message)s'
+    #logging.basicConfig(level=level, format=format)
+
+    # run all methods that start with 'test'
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import json
+import logging
+import unittest
+import threading
+from   urllib.request import urlopen
+from   urllib.error import HTTPError
+from   concurrent.futures import ThreadPoolExecutor
+import lemminflect
+from   lemminflect.serve import LemmInflectServer
+
+
+class ServeTests(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ServeTests, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.server = LemmInflectServer(('127.0.0.1', 0), batch_window=0.05)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, path, body=None):
+        data = None if body is None else json.dumps(body).encode('utf8')
+        with urlopen(self.url + path, data) as response:
+            return json.loads(response.read())['result']
+
+    def testEndpoints(self):
+        self.assertEqual(self.request('/getAllLemmas?word=watches'),
+                         json.loads(json.dumps(lemminflect.getAllLemmas('watches'))))
+        self.assertEqual(self.request('/getInflection?lemma=xyzzy&tag=NNS&inflect_oov=false'), [])
+        self.assertEqual(self.request('/getAllInflections', {'lemma':'watch', 'upos':'VERB'}),
+                         json.loads(json.dumps(lemminflect.getAllInflections('watch', 'VERB'))))
+        words = ['watches', 'Alaskans', 'xyzzies']
+        upos  = ['VERB', 'PROPN', 'NOUN']
+        self.assertEqual(self.request('/getLemmas', {'words':words, 'upos':upos}),
+                         [list(l) for l in lemminflect.getLemmas(words, upos)])
+        self.assertEqual(self.request('/getInflections?lemmas=watch,be&tags=VBD,VBZ'),
+                         [['watched'], ['is']])
+        with self.assertRaises(HTTPError) as cm:
+            self.request('/getLemma?word=watches')
+        self.assertEqual(cm.exception.code, 400)
+        with self.assertRaises(HTTPError) as cm:
+            self.request('/getLemmata?word=watches')
+        self.assertEqual(cm.exception.code, 404)
+        stats = self.request('/stats')
+        self.assertEqual(stats['requests']['/getLemma']['errors'], 1)
+        self.assertIn('hit_rate', stats['caches']['lemma'])
+
+    def testBadArguments(self):
+        # Arguments of the wrong type are a 400, not a 500
+        for path, body in [('/getAllLemmas', {'word':7}), ('/getAllInflections', {'lemma':None}),
+                           ('/getAllLemmas', {'word':'watches', 'upos':['VERB']}),
+                           ('/getLemma', {'word':'watches', 'upos':1}),
+                           ('/getLemmas', {'words':[None], 'upos':['NOUN']}),
+                           ('/getInflections', {'lemmas':['watch'], 'tags':5}),
+                           ('/getInflections', {'lemmas':['watch'], 'tags':[{}]})]:
+            with self.assertRaises(HTTPError) as cm:
+                self.request(path, body)
+            self.assertEqual(cm.exception.code, 400, path)
+        self.assertEqual(self.request('/getAllLemmas', {'word':'watches', 'upos':None}),
+                         json.loads(json.dumps(lemminflect.getAllLemmas('watches'))))
+
+    def testBadRequestInBatch(self):
+        # A bad request doesn't fail a valid one batched with it
+        def post(path, body):
+            try:
+                return self.request(path, body)
+            except HTTPError as e:
+                return e.code
+        requests = [('/getLemmas', {'words':[None], 'upos':['NOUN']}),
+                    ('/getLemma', {'word':'watches', 'upos':'VERB'})]
+        with ThreadPoolExecutor(len(requests)) as executor:
+            results = list(executor.map(lambda r: post(*r), requests))
+        self.assertEqual(results, [400, ['watch']])
+
+    def testBatching(self):
+        words = ['watches', 'abscissae', 'xyzzies', 'dogs', 'geese']
+        with ThreadPoolExecutor(len(words)) as executor:
+            lemmas = list(executor.map(lambda w: self.request('/getLemma?upos=NOUN&word=' + w),
+                                       words))
+        self.assertEqual(lemmas, [list(lemminflect.getLemma(w, 'NOUN')) for w in words])
+        self.assertLess(self.request('/stats')['batches']['lemma'], len(words))
+
+
+if __name__ == '__main__':
+    level  = logging.WARNING
+    format = '[%(levelname)s %(filename)s ln=%(lineno)s] %(message)s'
+    #logging.basicConfig(level=level, format=format)
+
+    # run all methods that start with 'test'
+    unittest.main()
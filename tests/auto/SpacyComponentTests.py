@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+import sys
+sys.path.insert(0, '../..')    # make '..' first in the lib search path
+import logging
+import unittest
+from   lemminflect.core.Lemmatizer import Lemmatizer
+from   lemminflect.core.SpacyComponents import LemmatizerComponent
+
+
+# Minimal stand-in for a spaCy Token, with just the attributes the component uses
+class FakeToken(object):
+    def __init__(self, text, tag, pos):
+        self.text   = text
+        self.tag_   = tag
+        self.pos_   = pos
+        self.lemma_ = ''
+
+
+# These tests don't require spaCy. The docs are lists of FakeTokens.
+class SpacyComponentTests(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(SpacyComponentTests, self).__init__(*args, **kwargs)
+
+    def getDocs(self):
+        words = [[('I', 'PRP', 'PRON'), ('was', 'VBD', 'AUX'), ('testing', 'VBG', 'VERB'),
+                  ('these', 'DT', 'DET'), ('xxwidgets', 'NNS', 'NOUN'), ('.', '.', 'PUNCT')],
+                 [('Octopi', 'NNS', 'NOUN'), ('are', 'VBP', 'AUX'), ('bigger', 'JJR', 'ADJ'),
+                  ('Alaskans', 'NNPS', 'PROPN'), ('zzfrobbed', 'VBD', 'VERB')],
+                 [('Axes', 'NNS', 'NOUN'), ('dogs', 'NNS', 'X')]]
+        return [[FakeToken(*t) for t in doc] for doc in words]
+
+    def testLemmatizerComponent(self):
+        lemmatizer = Lemmatizer()
+        for kwargs in [{}, {'form_num':1}, {'lemmatize_oov':False}, {'on_empty_ret_word':False}]:
+            component = LemmatizerComponent(**kwargs)
+            docs = list(component.pipe(self.getDocs(), batch_size=2))
+            self.assertEqual(len(docs), 3)
+            for token in [t for doc in docs for t in doc]:
+                expected = lemmatizer.spacyGetLemma(token, **kwargs)
+                self.assertEqual(token.lemma_, '' if expected is None else expected, token.text)
+        # Single doc
+        doc = LemmatizerComponent()(self.getDocs()[0])
+        self.assertEqual([t.lemma_ for t in doc], ['I', 'be', 'test', 'these', 'xxwidget', '.'])
+
+
+if __name__ == '__main__':
+    level  = logging.WARNING
+    format = '[%(levelname)s %(filename)s ln=%(lineno)s] %(message)s'
+    #logging.basicConfig(level=level, format=format)
+
+    # run all methods that start with 'test'
+    unittest.main()
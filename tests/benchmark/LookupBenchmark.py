@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+import gc
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from   lemminflect.codecs.LemmaLUCodec      import LemmaLUCodec
+from   lemminflect.codecs.InflectionLUCodec import InflectionLUCodec
+from   lemminflect.codecs.LexiconBinCodec   import LexiconBinCodec, MappedLexicon
+from   lemminflect import config
+
+
+# Memory used by the python objects created by func, and its return value
+def measure(func):
+    gc.collect()
+    tracemalloc.start()
+    value = func()
+    gc.collect()
+    nbytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, nbytes
+
+def readFile(fn):
+    with open(fn, 'rb') as f:
+        return f.read()
+
+# Average time in microseconds for a lookup of each word
+def timeLookups(lu, words, repeat):
+    get = lu.get
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for word in words:
+            get(word)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return 1e6 * best / len(words)
+
+
+# Compare lookups in the dict of dicts loaded from the csv file with the binary format, using
+# the binary search (sorted) and the perfect hash index, both in memory and memory-mapped.
+# The memory column is the python objects created (tracemalloc).  The binary formats also hold
+# the buffer, which is shown separately since the mmap version's pages are shared between
+# processes.
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lookup table benchmarks')
+    parser.add_argument('--nwords', type=int, default=20000, help='Number of words looked up')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each benchmark')
+    args = parser.parse_args()
+
+    random.seed(0)
+    tmpdir = tempfile.mkdtemp()
+    for name, fn, codec in [('lemma', config.lemma_lu_fn, LemmaLUCodec),
+                            ('infl',  config.inflection_lu_fn, InflectionLUCodec)]:
+        lu_dict = codec.load(fn)
+        hits   = random.choices(list(lu_dict), k=args.nwords)
+        misses = ['xx' + w for w in hits]
+        print('%s (%d entries)' % (name, len(lu_dict)))
+        print('  %-14s  %10s  %10s  %10s  %10s  %10s' % ('', 'load ms', 'objects KB', 'buffer KB',
+            'hit us', 'miss us'))
+        for index in ('sorted', 'hash'):
+            t0 = time.perf_counter()
+            data = LexiconBinCodec.toBytes(lu_dict, index)
+            print('  %-14s  build %.1f ms' % (index, 1000*(time.perf_counter() - t0)))
+            bin_fn = os.path.join(tmpdir, '%s_%s.bin' % (name, index))
+            with open(bin_fn, 'wb') as f:
+                f.write(data)
+        hash_fn = os.path.join(tmpdir, name + '_hash.bin')
+        rows = [('dict',         lambda: codec.load(fn)),
+                ('sorted',       lambda: MappedLexicon(readFile(os.path.join(tmpdir,
+                                                                name + '_sorted.bin')))),
+                ('hash',         lambda: MappedLexicon(readFile(hash_fn))),
+                ('hash (mmap)',  lambda: LexiconBinCodec.load(hash_fn))]
+        for label, loader in rows:
+            t0 = time.perf_counter()
+            lu, nbytes = measure(loader)
+            load_ms = 1000*(time.perf_counter() - t0)
+            buf_size = len(lu.buf) if isinstance(lu, MappedLexicon) else 0
+            if isinstance(lu, MappedLexicon) and isinstance(lu.buf, bytes):
+                nbytes -= buf_size      # the buffer is shown separately
+            print('  %-14s  %10.1f  %10.0f  %10.0f  %10.2f  %10.2f' % (label, load_ms,
+                nbytes/1024, buf_size/1024, timeLookups(lu, hits, args.repeat),
+                timeLookups(lu, misses, args.repeat)))
+        print()
+    for fn in os.listdir(tmpdir):
+        os.remove(os.path.join(tmpdir, fn))
+    os.rmdir(tmpdir)
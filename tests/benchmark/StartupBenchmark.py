@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from   statistics import median
+
+# Root of the repository, inserted into the path of each sub-process so it tests this copy
+LIB_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+# Each benchmark is run in a fresh python process.  Setup is run first and isn't timed.
+# The timed code is measured with perf_counter and the peak RSS (ru_maxrss) is taken at the end.
+BENCHMARKS = [
+    # name                   setup                       timed code
+    ('baseline',             '',                         'pass'),
+    ('import',               '',                         'import lemminflect'),
+    ('first_lemma_dict',     'import lemminflect',       'lemminflect.getLemma("watches", "VERB")'),
+    ('first_lemma_oov',      'import lemminflect',       'lemminflect.getLemma("xxwatches", "VERB")'),
+    ('first_inflection',     'import lemminflect',       'lemminflect.getInflection("watch", "VBD")'),
+    ('first_inflection_oov', 'import lemminflect',       'lemminflect.getInflection("xxwatch", "VBD")'),
+    ('first_lemma_and_infl', 'import lemminflect',       'lemminflect.getLemma("watches", "VERB"); '
+                                                         'lemminflect.getInflection("watch", "VBD")'),
+    # The individual loaders used above
+    ('LemmaLUCodec.load',    'from lemminflect.codecs.LemmaLUCodec import LemmaLUCodec',
+                             'LemmaLUCodec.load(config.lemma_lu_fn)'),
+    ('InflectionLUCodec.load', 'from lemminflect.codecs.InflectionLUCodec import InflectionLUCodec',
+                             'InflectionLUCodec.load(config.inflection_lu_fn)'),
+    ('DataContainer.load',   'from lemminflect.utils.DataContainer import DataContainer',
+                             'DataContainer.load(config.model_lemma_fn)'),
+]
+
+CHILD_CODE = '''
+import sys, time, json, resource
+sys.path.insert(0, {lib_dir!r})
+{config}
+{setup}
+t0 = time.perf_counter()
+{timed}
+dt = time.perf_counter() - t0
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':    # bytes on macOS, KB on linux
+    maxrss //= 1024
+print(json.dumps({{'time':dt, 'maxrss_kb':maxrss}}))
+'''
+
+# Run a single benchmark in a new process and return its dict of results
+def runChild(setup, timed, config_lines):
+    code = CHILD_CODE.format(lib_dir=LIB_DIR, config=config_lines, setup=setup, timed=timed)
+    out = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+# Print the change from a previously saved set of results
+def printComparison(old_report, new_report):
+    print('%-24s  %20s  %22s' % ('', 'time (ms)', 'maxrss (KB)'), file=sys.stderr)
+    for name, new in new_report['results'].items():
+        old = old_report['results'].get(name)
+        if old is None:
+            continue
+        print('%-24s  %8.1f -> %8.1f  %9d -> %9d' % (name, 1000*old['time_median'],
+            1000*new['time_median'], old['maxrss_kb'], new['maxrss_kb']), file=sys.stderr)
+
+def getGitCommit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=LIB_DIR,
+            universal_newlines=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Measure the cold start time and memory for importing lemminflect and for the first call of
+# each type.  Results are written as JSON so they can be saved and compared across commits.
+# ie..  ./StartupBenchmark.py --out before.json
+#       (make changes)
+#       ./StartupBenchmark.py --compare before.json
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Startup time and memory benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each benchmark')
+    parser.add_argument('--lu-format', help='Set config.lu_format (csv, mmap or unified)')
+    parser.add_argument('--lu-intern', action='store_true', help='Set config.lu_intern')
+    parser.add_argument('--kinfer-type', help='Set config.kinfer_type (numpy, keras or table)')
+    parser.add_argument('--only', nargs='+', help='Only run the named benchmarks')
+    parser.add_argument('--out', help='Write the JSON results to this file instead of stdout')
+    parser.add_argument('--compare', help='JSON results from a previous run to compare against')
+    args = parser.parse_args()
+
+    # config needs to be imported for the loader benchmarks, and to apply the options
+    config_lines = 'from lemminflect import config'
+    if args.lu_format:
+        config_lines += '\nconfig.lu_format = %r' % args.lu_format
+    if args.lu_intern:
+        config_lines += '\nconfig.lu_intern = True'
+    if args.kinfer_type:
+        config_lines += '\nconfig.kinfer_type = %r' % args.kinfer_type
+
+    results = {}
+    for name, setup, timed in BENCHMARKS:
+        if args.only and name not in args.only:
+            continue
+        # Importing config imports lemminflect, so it can't be used when timing the import
+        if name in ('baseline', 'import'):
+            runs = [runChild('', timed, '') for _ in range(args.repeat)]
+        else:
+            runs = [runChild(setup, timed, config_lines) for _ in range(args.repeat)]
+        times = [r['time'] for r in runs]
+        results[name] = {'time_median':median(times), 'time_min':min(times),
+                         'maxrss_kb':max(r['maxrss_kb'] for r in runs)}
+        print('%-24s  %8.1f ms  %8d KB' % (name, 1000*results[name]['time_median'],
+            results[name]['maxrss_kb']), file=sys.stderr)
+
+    report = {'commit':getGitCommit(), 'python':platform.python_version(),
+              'platform':platform.platform(), 'repeat':args.repeat,
+              'lu_format':args.lu_format, 'lu_intern':args.lu_intern,
+              'kinfer_type':args.kinfer_type, 'results':results}
+    if args.compare:
+        with open(args.compare) as f:
+            printComparison(json.load(f), report)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)